@@ -41,6 +41,12 @@ class CommandLine:
             action="store_true",
             help="Check config files"
         )
+        cfg_group.add_argument("-hashbench", "--hashbench", type=str, help="Benchmark the hash engines")
+        cfg_group.add_argument("-fuzzbench", "--fuzzbench", type=str,
+                               help="Benchmark the title matching on a list of release names")
+        cfg_group.add_argument("-tmdbimport", "--tmdbimport", type=str,
+                               help="Build the local TMDB index from an id export")
+        cfg_group.add_argument("-stats", "--stats", action="store_true", help="Print the cache counters at the end")
 
         # /////////////////////////
         # Upload Commands
@@ -83,6 +89,10 @@ class CommandLine:
         search_group.add_argument("-dmp", "--dump", action="store_true", help="Dump titles")
         search_group.add_argument("-sch", "--search", type=str, help="Search torrent")
         search_group.add_argument("-db", "--dbsave", action="store_true", help="Save results")
+        search_group.add_argument("-sync", "--sync", action="store_true",
+                                  help="Mirror the tracker catalog in the local database")
+        search_group.add_argument("-local", "--local", action="store_true",
+                                  help="Search the local mirror, all the filters together")
         search_group.add_argument("-i", "--info", type=str, help="Torrent info")
         search_group.add_argument("-up", "--uploader", type=str, help="By uploader")
         search_group.add_argument("-d", "--description", type=str, help="By description")
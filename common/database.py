@@ -1,6 +1,8 @@
 import json
 import os
+import re
 import sqlite3
+from urllib.parse import urlencode, parse_qsl, urlsplit
 from unit3dup import config_settings
 
 # Torrent attributes
@@ -47,32 +49,284 @@ create_table_sql = ('\n'
                     ')\n')
 
 
+# Sync progress and other values of the mirror
+create_state_sql = 'CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)'
+
+# Columns returned by the tracker as json objects
+json_columns = ('files', 'meta')
+
+# Columns usable for a local lookup
+id_columns = ('tmdb_id', 'imdb_id', 'tvdb_id', 'igdb_id', 'mal_id', 'uploader')
+
+# Indexes for the local lookups
+create_index_sql = ('CREATE INDEX IF NOT EXISTS torrents_tmdb_id ON torrents (tmdb_id)',
+                    'CREATE INDEX IF NOT EXISTS torrents_imdb_id ON torrents (imdb_id)',
+                    'CREATE INDEX IF NOT EXISTS torrents_tvdb_id ON torrents (tvdb_id)',
+                    'CREATE INDEX IF NOT EXISTS torrents_igdb_id ON torrents (igdb_id)',
+                    'CREATE INDEX IF NOT EXISTS torrents_mal_id ON torrents (mal_id)',
+                    'CREATE INDEX IF NOT EXISTS torrents_uploader ON torrents (uploader)',
+                    'CREATE INDEX IF NOT EXISTS torrents_category_res ON torrents (category_id, resolution_id)',
+                    'CREATE INDEX IF NOT EXISTS torrents_created_at ON torrents (created_at)')
+
+# Full text index over name, description and media info, kept in sync by the triggers
+create_fts_sql = ("CREATE VIRTUAL TABLE IF NOT EXISTS torrents_fts USING fts5("
+                  "name, description, media_info, content='torrents', content_rowid='id', "
+                  "tokenize='unicode61 remove_diacritics 2')")
+
+create_trigger_sql = (
+    "CREATE TRIGGER IF NOT EXISTS torrents_ai AFTER INSERT ON torrents BEGIN "
+    "INSERT INTO torrents_fts(rowid, name, description, media_info) "
+    "VALUES (new.id, new.name, new.description, new.media_info); END",
+    "CREATE TRIGGER IF NOT EXISTS torrents_ad AFTER DELETE ON torrents BEGIN "
+    "INSERT INTO torrents_fts(torrents_fts, rowid, name, description, media_info) "
+    "VALUES ('delete', old.id, old.name, old.description, old.media_info); END",
+    "CREATE TRIGGER IF NOT EXISTS torrents_au AFTER UPDATE ON torrents BEGIN "
+    "INSERT INTO torrents_fts(torrents_fts, rowid, name, description, media_info) "
+    "VALUES ('delete', old.id, old.name, old.description, old.media_info); "
+    "INSERT INTO torrents_fts(rowid, name, description, media_info) "
+    "VALUES (new.id, new.name, new.description, new.media_info); END",
+)
+
+# Columns of the full text search
+fts_columns = ('name', 'description', 'media_info')
+
+# Local filters: the condition of each option
+filter_sql = {
+    'uploader': 'uploader = ?',
+    'tmdb_id': 'tmdb_id = ?',
+    'imdb_id': 'imdb_id = ?',
+    'tvdb_id': 'tvdb_id = ?',
+    'igdb_id': 'igdb_id = ?',
+    'mal_id': 'mal_id = ?',
+    'category_id': 'category_id = ?',
+    'type_id': 'type_id = ?',
+    'resolution_id': 'resolution_id = ?',
+    'start_year': 'release_year >= ?',
+    'end_year': 'release_year <= ?',
+    'freeleech': 'freeleech = ?',
+    'bd_info': 'bd_info LIKE ?',
+    'file_name': 'files LIKE ?',
+}
+
+# Local filters without a value
+flag_sql = {
+    'internal': 'internal = 1',
+    'personal_release': 'personal_release = 1',
+    'double_upload': 'double_upload = 1',
+    'featured': 'featured = 1',
+    'refundable': 'refundable = 1',
+    'alive': 'seeders > 0',
+    'dead': 'seeders = 0',
+    'dying': 'seeders = 1 AND times_completed >= 3',
+}
+
+fts_search_sql = ("SELECT torrents.* FROM torrents_fts JOIN torrents ON torrents.id = torrents_fts.rowid "
+                  "WHERE torrents_fts MATCH ? ORDER BY torrents.created_at DESC")
+
+
 class Database:
     """
     Create a new database and populate it with torrents attributes
     Search torrents based on attributes
+
+    The table is kept between runs: a torrent is updated by its info_hash
     """
 
-    def __init__(self, db_file):
+    def __init__(self, db_file: str):
         self.filename = db_file
         self.CACHE_PATH = config_settings.user_preferences.CACHE_PATH
         self.database = sqlite3.connect(os.path.join(self.CACHE_PATH, f"{db_file}.db"))
+        self.database.row_factory = sqlite3.Row
+        # Readers don't wait for the writer and a commit doesn't need a full fsync
+        self.database.execute("PRAGMA journal_mode=WAL")
+        self.database.execute("PRAGMA synchronous=NORMAL")
         self.cursor = self.database.cursor()
+        self.fts = False
         self.build()
 
-    def build(self):
-        self.cursor.execute("DROP TABLE IF EXISTS torrents")
+    def build(self) -> None:
         self.cursor.execute(create_table_sql)
+        self.cursor.execute(create_state_sql)
+        try:
+            self.cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS torrents_info_hash ON torrents (info_hash)")
+        except sqlite3.IntegrityError:
+            # A table saved by an older version may have the same torrent more than once
+            self.cursor.execute("DELETE FROM torrents WHERE id NOT IN "
+                                "(SELECT MAX(id) FROM torrents GROUP BY info_hash)")
+            self.cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS torrents_info_hash ON torrents (info_hash)")
+        for sql in create_index_sql:
+            self.cursor.execute(sql)
+        self.build_fts()
         self.database.commit()
+        self.columns = [row["name"] for row in self.cursor.execute("PRAGMA table_info(torrents)")
+                        if row["name"] != "id"]
+
+    def build_fts(self) -> None:
+        """ Create the full text index. Without the sqlite fts5 extension the text search uses LIKE """
+        exists = self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'torrents_fts'").fetchone()
+        try:
+            self.cursor.execute(create_fts_sql)
+        except sqlite3.OperationalError:
+            return
+        for sql in create_trigger_sql:
+            self.cursor.execute(sql)
+        if not exists:
+            # Index the torrents saved before the full text table
+            self.cursor.execute("INSERT INTO torrents_fts(torrents_fts) VALUES('rebuild')")
+        self.fts = True
+
+    def to_row(self, data: dict) -> dict:
+        """ The known columns of a torrent, the json objects as text. The attributes are not changed """
+        return {key: json.dumps(value) if isinstance(value, (dict, list)) else value
+                for key, value in data.items() if key in self.columns}
+
+    def write(self, data: dict) -> None:
+        self.write_many([data])
+
+    def write_many(self, items: list[dict]) -> None:
+        """
+        Insert new torrents or update the ones with the same info_hash
+
+        A single transaction for all the items, usually a page of the tracker
+        """
+        # One statement for each set of columns
+        groups: dict[tuple, list[tuple]] = {}
+        for item in items:
+            row = self.to_row(item)
+            groups.setdefault(tuple(row), []).append(tuple(row.values()))
 
-    def write(self, data: dict):
-        for key, value in data.items():
-            if isinstance(value, (dict, list)):
-                data[key] = json.dumps(value)
+        with self.database:
+            for keys, values in groups.items():
+                placeholders = ', '.join(['?'] * len(keys))
+                updates = ', '.join(f"{key} = excluded.{key}" for key in keys)
+                sql = (f"INSERT INTO torrents ({', '.join(keys)}) VALUES ({placeholders}) "
+                       f"ON CONFLICT(info_hash) DO UPDATE SET {updates}")
+                self.cursor.executemany(sql, values)
 
-        keys = ', '.join(data.keys())
-        placeholders = ', '.join(['?'] * len(data))
-        values = tuple(data.values())
-        sql = f'''INSERT INTO torrents ({keys}) VALUES ({placeholders})'''
-        self.cursor.execute(sql, values)
+    def get_state(self, key: str) -> str | None:
+        row = self.cursor.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_state(self, key: str, value: str) -> None:
+        self.cursor.execute("INSERT INTO sync_state (key, value) VALUES (?, ?) "
+                            "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value))
+        self.database.commit()
+
+    def clear_state(self, *keys: str) -> None:
+        self.cursor.executemany("DELETE FROM sync_state WHERE key = ?", [(key,) for key in keys])
         self.database.commit()
+
+    def synced(self) -> bool:
+        """ True if the catalog has been mirrored at least once and the last sync was not interrupted """
+        return self.get_state("last_created_at") is not None and self.get_state("crawl_next") is None
+
+    @staticmethod
+    def to_attributes(row: sqlite3.Row) -> dict:
+        attributes = dict(row)
+        attributes.pop("id", None)
+        for key in json_columns:
+            if attributes.get(key):
+                try:
+                    attributes[key] = json.loads(attributes[key])
+                except json.JSONDecodeError:
+                    pass
+        return attributes
+
+    def response(self, sql: str, params: tuple) -> dict:
+        """ The rows in the same shape of a tracker answer, in a single page """
+        rows = self.cursor.execute(sql, params).fetchall()
+        return {"data": [{"attributes": self.to_attributes(row)} for row in rows], "links": {"next": None}}
+
+    @staticmethod
+    def match(text: str, column: str | None = None) -> str:
+        """ A fts5 query: every word of the text as a prefix, in any column or in a single column """
+        words = re.findall(r"\w+", text.lower())
+        query = " ".join(f'"{word}"*' for word in words)
+        return f"{column} : ({query})" if column else query
+
+    @staticmethod
+    def imdb_number(value: str | int) -> str:
+        """ The tracker saves the imdb id without 'tt' and the leading zeros """
+        return str(value).strip().lower().replace('tt', '').lstrip('0')
+
+    def search_name(self, name: str) -> dict:
+        """ The torrents with every word of the name """
+        if self.fts and re.search(r"\w", name):
+            return self.response(fts_search_sql, (self.match(name, column="name"),))
+        # Like the tracker: the words of the name in the same order
+        return self.response("SELECT * FROM torrents WHERE name LIKE ? ORDER BY created_at DESC",
+                             (f"%{name.strip().replace(' ', '%')}%",))
+
+    def search_text(self, text: str, column: str | None = None) -> dict:
+        """ The torrents with every word of the text in the name, description or media info """
+        if column and column not in fts_columns:
+            raise ValueError(f"Unknown column '{column}'")
+        if self.fts and re.search(r"\w", text):
+            return self.response(fts_search_sql, (self.match(text, column=column),))
+        columns = [column] if column else fts_columns
+        return self.response(f"SELECT * FROM torrents WHERE {' OR '.join(f'{name} LIKE ?' for name in columns)} "
+                             f"ORDER BY created_at DESC", tuple(f"%{text.strip()}%" for _ in columns))
+
+    def where(self, filters: dict) -> tuple[str, list]:
+        """ The conditions of the filters, all of them together """
+        conditions = []
+        params = []
+        text = {column: filters[column] for column in fts_columns if filters.get(column)}
+        if text and self.fts:
+            conditions.append("id IN (SELECT rowid FROM torrents_fts WHERE torrents_fts MATCH ?)")
+            params.append(" AND ".join(self.match(value, column=column) for column, value in text.items()))
+        else:
+            for column, value in text.items():
+                conditions.append(f"{column} LIKE ?")
+                params.append(f"%{value.strip()}%")
+
+        for key, value in filters.items():
+            if key in filter_sql and value:
+                if key == 'imdb_id':
+                    value = self.imdb_number(value)
+                if key == 'freeleech' and str(value).isdigit():
+                    value = f"{value}%"
+                if filter_sql[key].endswith('LIKE ?'):
+                    value = f"%{value}%"
+                conditions.append(filter_sql[key])
+                params.append(value)
+            elif key in flag_sql and value:
+                conditions.append(flag_sql[key])
+            elif key not in fts_columns and value:
+                raise ValueError(f"Unknown filter '{key}'")
+        return " AND ".join(conditions) or "1", params
+
+    def query(self, filters: dict, page: int = 1, perPage: int = 100) -> dict:
+        """
+        Search the local mirror with many filters together
+
+        A page in the same shape of a tracker answer. The 'next' link holds the filters of the next page
+
+        Args:
+            filters: the column values (name, uploader, tmdb_id, resolution_id..) and the flags (alive, dead..)
+            page: the page number from 1
+            perPage: the torrents in a page
+        """
+        filters = {key: value for key, value in filters.items() if value}
+        where, params = self.where(filters)
+        rows = self.cursor.execute(f"SELECT * FROM torrents WHERE {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                                   (*params, perPage + 1, (page - 1) * perPage)).fetchall()
+        next_page = None
+        if len(rows) > perPage:
+            next_page = "local?" + urlencode({**filters, 'page': page + 1, 'perPage': perPage})
+        return {"data": [{"attributes": self.to_attributes(row)} for row in rows[:perPage]],
+                "links": {"next": next_page}}
+
+    def next(self, url: str) -> dict:
+        """ The next page of a local query, like the tracker next link """
+        filters = dict(parse_qsl(urlsplit(url).query))
+        page = int(filters.pop('page', 1))
+        perPage = int(filters.pop('perPage', 100))
+        return self.query(filters=filters, page=page, perPage=perPage)
+
+    def search_by(self, column: str, value: str | int) -> dict:
+        if column not in id_columns:
+            raise ValueError(f"Unknown column '{column}'")
+        if column == 'imdb_id':
+            value = self.imdb_number(value)
+        return self.response(f"SELECT * FROM torrents WHERE {column} = ? ORDER BY created_at DESC", (value,))
@@ -4,7 +4,7 @@ from rich.align import Align
 from rich.table import Table
 
 from common.external_services.igdb.core.models.search import Game
-from common.external_services.igdb.core.api import IGDBapi
+from common.external_services.igdb.core.api import IGDBapi, SEARCH_TTL
 
 from unit3dup.media import Media
 from view import custom_console
@@ -93,7 +93,7 @@ class IGDBClient:
         self.category_filter = "category = (0, 1, 2, 8, 9, 10)"
 
         self.queries = {
-            "media" : "fields game,name,video_id; where id = {video_id};",
+            "media" : "fields game,name,video_id; where id = ({videos_id}); limit 500;",
             "title" : 'fields id,name,summary,videos; search "{title}";'
                       ' where platforms = ({platform_name}) & {category_filter};',
             "title_no_platform": 'fields id,name,summary,videos; search "{title}";',
@@ -104,12 +104,13 @@ class IGDBClient:
 
 
     def trailers(self, videos_id: list)-> list:
-        return [
-            response[0].get('video_id', None)
-            for video_id in videos_id
-            if (response := self.igdb.request(query=self.queries['media'].format(video_id=video_id),
-                                              endpoint="game_videos")) is not None
-        ]
+        if not videos_id:
+            return []
+        # All the videos in one request
+        response = self.igdb.request(query=self.queries['media'].format(videos_id=",".join(map(str, videos_id))),
+                                     endpoint="game_videos")
+        videos = {video.get('id'): video.get('video_id', None) for video in response or []}
+        return [videos[video_id] for video_id in videos_id if video_id in videos]
 
     def game_description(self, mygame: Game)-> Game:
 
@@ -134,10 +135,17 @@ class IGDBClient:
     def search(self, title: str, platform_name: str)-> list:
         return self.igdb.request(query=f'fields id,name,summary,videos,platforms,url; search "{title}";'
                                        f' where platforms = ({platform_name}) & ({self.category_filter});',
-                                 endpoint="games")
+                                 endpoint="games", ttl=SEARCH_TTL)
 
     def search_no_platform(self, title: str)-> list:
-        return self.igdb.request(query=f'fields id,name,summary,videos,platforms,url; search "{title}";',endpoint="games")
+        return self.igdb.request(query=f'fields id,name,summary,videos,platforms,url; search "{title}";',
+                                 endpoint="games", ttl=SEARCH_TTL)
+
+    def search_fragments(self, titles: list[str]) -> list[list | None]:
+        """ search_no_platform for each title in a multiquery request """
+        return self.igdb.multiquery(queries=[
+            ("games", f'fields id,name,summary,videos,platforms,url; search "{title}";') for title in titles
+        ])
 
     def search_by_id(self, igdb_id: int)-> list:
         return self.igdb.request(query=f'fields id,name,summary,videos,url; where id = {igdb_id};',endpoint="games")
@@ -202,12 +210,14 @@ class IGDBClient:
         # get similar results by searching 'build_title' and comparing the results with 'game_title'
         similar_results = []
 
-        # iterate  each piece of title
+        # every piece of title added step by step
+        build_titles = []
         for piece in split_title:
-            # building title step by step
             build_title+= ' ' + piece
-            #get results from the searching of build_title
-            igdb_results = self.search_no_platform(title=build_title)
+            build_titles.append(build_title)
+
+        # search all of them at once and iterate the results
+        for build_title, igdb_results in zip(build_titles, self.search_fragments(build_titles)):
             if igdb_results:
                 # compare the results with game_title
                 similar_results = (self.similar(igdb_results=igdb_results, game_title=game_title)
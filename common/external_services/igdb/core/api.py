@@ -1,10 +1,25 @@
 # -*- coding: utf-8 -*-
+import os
+import threading
 
+import diskcache
+import httpx
 from urllib.parse import urljoin
 from common.external_services.sessions.session import MyHttp
 from common import config_settings
 from view import custom_console
 
+# Seconds a cached response is used before asking IGDB again
+SEARCH_TTL = 24 * 3600
+GAME_TTL = 30 * 24 * 3600
+
+# Queries allowed in a single multiquery request
+MULTIQUERY_LIMIT = 10
+
+# Token used until it expires, shared by all the clients
+TOKEN_MARGIN = 60
+
+
 class IGDBapi:
 
     params = {
@@ -16,11 +31,16 @@ class IGDBapi:
     base_request_url = "https://api.igdb.com/v4/"
     oauth = "https://id.twitch.tv/oauth2/token"
 
+    # One login for each process and one token until it expires
+    _token_lock = threading.Lock()
+
     def __init__(self):
         self.access_header = None
         self.header_access = None
         self.http_client = None
-
+        self.cached_token = False
+        self.token_cache = diskcache.Cache(str(os.path.join(config_settings.user_preferences.CACHE_PATH,
+                                                            "igdb.cache")))
 
     def login(self)-> bool:
         if not config_settings.tracker_config.IGDB_CLIENT_ID:
@@ -36,34 +56,79 @@ class IGDBapi:
             "Accept": "application/json",
         })
 
+        with self._token_lock:
+            # Reuse the token of a previous login if it has not expired yet
+            access_token = self.token_cache.get(self.token_key())
+            self.cached_token = bool(access_token)
+            if not access_token:
+                response = self.http_client.post(self.oauth, params = {
+                    "client_id": config_settings.tracker_config.IGDB_CLIENT_ID,
+                    "client_secret": config_settings.tracker_config.IGDB_ID_SECRET,
+                    "grant_type": "client_credentials",
+                })
 
-        response = self.http_client.post(self.oauth, params = {
-            "client_id": config_settings.tracker_config.IGDB_CLIENT_ID,
-            "client_secret": config_settings.tracker_config.IGDB_ID_SECRET,
-            "grant_type": "client_credentials",
-        })
+                # None for any http error or connection error
+                if not response:
+                    custom_console.bot_error_log("Failed to authenticate with IGDB.\n")
+                    custom_console.bot_error_log("IGDB Login failed. Please check your credentials")
+                    return False
 
-        if response:
-            authentication = response.json()
-            access_token = authentication["access_token"]
-            expires = authentication["expires_in"]
-            token_type = authentication["token_type"]
-            custom_console.bot_log("IGDB Login successful!")
-
-            self.access_header = {
-                "Client-ID": config_settings.tracker_config.IGDB_CLIENT_ID,
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json",
-            }
-            return True
-        else:
-            custom_console.bot_error_log("Failed to authenticate with IGDB.\n")
-            custom_console.bot_error_log("IGDB Login failed. Please check your credentials")
-            return False
+                authentication = response.json()
+                access_token = authentication["access_token"]
+                expires = authentication["expires_in"]
+                token_type = authentication["token_type"]
+                self.token_cache.set(self.token_key(), access_token, expire=max(1, expires - TOKEN_MARGIN))
+                custom_console.bot_log("IGDB Login successful!")
 
+        self.access_header = {
+            "Client-ID": config_settings.tracker_config.IGDB_CLIENT_ID,
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+        }
+        return True
 
-    def request(self, query:str , endpoint:str)-> list:
+    @staticmethod
+    def token_key() -> str:
+        # A new client id needs a new token
+        return f"token|{config_settings.tracker_config.IGDB_CLIENT_ID}"
+
+    def _post(self, endpoint: str, query: str, ttl: int) -> httpx.Response | None:
         build_request = urljoin(self.base_request_url, endpoint)
-        response = self.http_client.post(build_request, headers=self.access_header, data=query)
+        response = self.http_client.post(build_request, headers=self.access_header, data=query,
+                                         use_cache=config_settings.user_preferences.HTTP_CACHE, ttl=ttl)
+        # The http client returns None for any error, 401 included. A token from a previous run may have been
+        # revoked before its expiration: login again and retry once
+        if response is None and self.cached_token:
+            self.token_cache.delete(self.token_key())
+            if self.login():
+                response = self.http_client.post(build_request, headers=self.access_header, data=query,
+                                                 use_cache=config_settings.user_preferences.HTTP_CACHE, ttl=ttl)
+        return response
+
+    def request(self, query:str , endpoint:str, ttl: int = GAME_TTL)-> list:
+        response = self._post(endpoint=endpoint, query=query, ttl=ttl)
         if response:
-            return response.json()
\ No newline at end of file
+            return response.json()
+
+    def multiquery(self, queries: list[tuple[str, str]], ttl: int = SEARCH_TTL) -> list[list | None]:
+        """
+        Send many queries with a request for each group of ten
+
+        Args:
+            queries: a list of (endpoint, query)
+
+        Returns:
+            the results of each query in the same order. None if a request failed
+        """
+        results: list[list | None] = []
+        for start in range(0, len(queries), MULTIQUERY_LIMIT):
+            group = queries[start:start + MULTIQUERY_LIMIT]
+            body = "".join(f'query {endpoint} "{index}" {{ {query} }};'
+                           for index, (endpoint, query) in enumerate(group))
+            response = self._post(endpoint="multiquery", query=body, ttl=ttl)
+            if not response:
+                results.extend([None] * len(group))
+                continue
+            answers = {answer.get('name'): answer.get('result', []) for answer in response.json()}
+            results.extend(answers.get(str(index)) for index in range(len(group)))
+        return results
@@ -1,22 +1,49 @@
 # -*- coding: utf-8 -*-
 
 import base64
+import hashlib
 import json
+import os
+import threading
 import time
+import diskcache
 import requests
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from common import config_settings
 from view import custom_console
 
 
 class ImageUploader(ABC):
+
+    # One keep-alive session and one concurrency cap for each host
+    _sessions: dict[str, requests.Session] = {}
+    _semaphores: dict[str, threading.BoundedSemaphore] = {}
+    _lock = threading.Lock()
+    # Order of the hosts, set by each host from the user preferences
+    priority: int
+
     def __init__(self, image: bytes, key: str, image_name: str):
         self.image = base64.b64encode(image)
         self.key = key
         self.image_name = image_name
         self.timeout = 30
 
+    @classmethod
+    def session(cls) -> tuple[requests.Session, threading.BoundedSemaphore]:
+        """ Return the pooled session of this host and its semaphore """
+        host = cls.__name__
+        with ImageUploader._lock:
+            if host not in ImageUploader._sessions:
+                limit = max(1, config_settings.user_preferences.IMAGEHOST_HOST_LIMIT)
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=limit))
+                ImageUploader._sessions[host] = session
+                ImageUploader._semaphores[host] = threading.BoundedSemaphore(limit)
+            return ImageUploader._sessions[host], ImageUploader._semaphores[host]
+
     @abstractmethod
     def get_endpoint(self):
         pass
@@ -39,9 +66,11 @@ class ImageUploader(ABC):
         while upload_n < 4:
             try:
                 upload_n += 1
-                response = requests.post(
-                    self.get_endpoint(), data = data, files = files, timeout = self.timeout
-                )
+                session, semaphore = self.session()
+                with semaphore:
+                    response = session.post(
+                        self.get_endpoint(), data = data, files = files, timeout = self.timeout
+                    )
                 response.raise_for_status()
                 return response.json()
 
@@ -198,7 +227,7 @@ class ImageUploaderFallback:
     def __init__(self, uploader):
         self.uploader = uploader
 
-    def upload(self, test=False) -> str:
+    def upload(self, test=False) -> str | None:
         result = None
 
         # Get response from the uploader
@@ -251,13 +280,147 @@ class ImageUploaderFallback:
 
         return None
 
+class HostScoreboard:
+    """
+    Health and latency of the image hosts, saved in CACHE_PATH between runs
+
+    A host that fails is skipped (circuit open) for a backoff window that doubles after each
+    consecutive failure, up to a day. When the window expires a single upload probes the host (half-open):
+    a success closes the circuit, a failure opens it again for a longer window
+    """
+
+    backoff_base = 300
+    backoff_max = 24 * 3600
+    samples = 50
+
+    def __init__(self) -> None:
+        self.cache = diskcache.Cache(str(os.path.join(config_settings.user_preferences.CACHE_PATH, "imagehost.cache")))
+        self._lock = threading.Lock()
+        # Half-open hosts with a probe in flight
+        self._probing: set[str] = set()
+
+    def _load(self, host: str) -> dict:
+        return self.cache.get(host, {"success": 0, "failure": 0, "latency": [], "last_failure": 0,
+                                     "consecutive_failures": 0, "open_until": 0})
+
+    def record(self, host: str, ok: bool, latency: float) -> None:
+        with self._lock:
+            self._probing.discard(host)
+            stats = self._load(host)
+            if ok:
+                stats["success"] += 1
+                stats["latency"] = (stats["latency"] + [latency])[-self.samples:]
+                stats["consecutive_failures"] = 0
+                stats["open_until"] = 0
+            else:
+                stats["failure"] += 1
+                stats["consecutive_failures"] += 1
+                stats["last_failure"] = time.time()
+                backoff = min(self.backoff_base * 2 ** (stats["consecutive_failures"] - 1), self.backoff_max)
+                stats["open_until"] = time.time() + backoff
+            self.cache[host] = stats
+
+    def allow(self, host: str) -> bool:
+        """ True if an upload can be sent to the host: circuit closed, or the only probe of a half-open host """
+        with self._lock:
+            stats = self._load(host)
+            if not stats["consecutive_failures"]:
+                return True
+            if stats["open_until"] > time.time() or host in self._probing:
+                return False
+            self._probing.add(host)
+            return True
+
+    def success_rate(self, host: str) -> float:
+        stats = self._load(host)
+        total = stats["success"] + stats["failure"]
+        return stats["success"] / total if total else 1.0
+
+    def percentile(self, host: str, percent: int) -> float:
+        latency = sorted(self._load(host)["latency"])
+        if not latency:
+            return 0.0
+        return latency[min(len(latency) - 1, int(len(latency) * percent / 100))]
+
+    def sort_key(self, uploader: 'ImageUploader') -> tuple:
+        """ Reliability first, then speed (2s buckets of the median, then 5s buckets of the p95), then the priority """
+        host = uploader.__class__.__name__
+        return (-round(self.success_rate(host) * 10), int(self.percentile(host, 50) // 2),
+                int(self.percentile(host, 95) // 5), uploader.priority)
+
+
+class ScreenshotCache:
+    """
+    Content-addressed store of the uploaded screenshots, saved in CACHE_PATH. Used only with CACHE_SCR on
+
+    - sha256 of the image -> url for each host
+    - identity of the video (file, size, mtime, number of screenshots, resize/compress settings) -> sha256 of its frames
+
+    The urls expire after IMAGEHOST_URL_TTL days (0 = never) because some hosts remove the images
+    """
+
+    def __init__(self) -> None:
+        self.cache = diskcache.Cache(str(os.path.join(config_settings.user_preferences.CACHE_PATH,
+                                                      "screenshots.cache")))
+        days = config_settings.user_preferences.IMAGEHOST_URL_TTL
+        self.ttl = days * 24 * 3600 if days > 0 else None
+
+    @staticmethod
+    def digest(img_bytes: bytes) -> str:
+        return hashlib.sha256(img_bytes).hexdigest()
+
+    @staticmethod
+    def video_key(video_path: str, num_screenshots: int, webp: bool) -> str:
+        """ A different file or different frame settings is a different key """
+        stat = os.stat(video_path)
+        return (f"video:{os.path.abspath(video_path)}|{stat.st_size}|{stat.st_mtime_ns}|{num_screenshots}|"
+                f"{config_settings.user_preferences.RESIZE_SCSHOT}|{config_settings.user_preferences.COMPRESS_SCSHOT}|"
+                f"{webp}")
+
+    def url(self, digest: str, skip: set | None = None) -> str | None:
+        """ Return the url of an image already uploaded to a host that is not in the skip list """
+        hosts = self.cache.get(f"sha256:{digest}", {})
+        for host, (url, stored_at) in hosts.items():
+            if skip and host in skip:
+                continue
+            if self.ttl is None or time.time() - stored_at < self.ttl:
+                return url
+        return None
+
+    def store(self, digest: str, host: str, url: str) -> None:
+        key = f"sha256:{digest}"
+        with self.cache.transact():
+            hosts = self.cache.get(key, {})
+            hosts[host] = (url, time.time())
+            self.cache.set(key, hosts, expire=self.ttl)
+
+    def video_frames(self, key: str) -> dict | None:
+        """ The digests of the frames extracted from this video and its HD flag """
+        return self.cache.get(key)
+
+    def store_video_frames(self, key: str, digests: list[str], is_hd: int) -> None:
+        self.cache.set(key, {"digests": digests, "is_hd": is_hd}, expire=self.ttl)
+
+    def video_urls(self, key: str) -> tuple[list[str], int] | None:
+        """ The urls of all the frames of this video, if every one of them is still available """
+        record = self.video_frames(key)
+        if not record:
+            return None
+        urls = [url for digest in record["digests"] if (url := self.url(digest))]
+        if not urls or len(urls) < len(record["digests"]):
+            return None
+        return urls, record["is_hd"]
+
+
 class Build:
     """
     - Upload screenshots and create a new description
     """
-    offline_uploaders = []
+    # Shared by all the frames in flight: a failed host is skipped by everyone
+    offline_uploaders: set[str] = set()
+    _scoreboard: HostScoreboard | None = None
 
-    def __init__(self, extracted_frames: list[bytes], filename: str):
+    def __init__(self, extracted_frames: list[bytes], filename: str, frame_urls: list[str] | None = None):
 
         # Image filename
         self.filename = filename
@@ -271,54 +434,110 @@ class Build:
         self.PASSIMA_KEY = config_settings.tracker_config.PASSIMA_KEY
         self.IMARIDE_KEY = config_settings.tracker_config.IMARIDE_KEY
         self.extracted_frames = extracted_frames
+        # Urls of the frames already uploaded: nothing to upload
+        self.frame_urls = frame_urls
+
+        if Build._scoreboard is None:
+            Build._scoreboard = HostScoreboard()
+        self.scoreboard: HostScoreboard = Build._scoreboard
+        # Only with the screenshots cache enabled
+        self.screenshot_cache = ScreenshotCache() if config_settings.user_preferences.CACHE_SCR else None
+
+    def upload_frame(self, number: int, img_bytes: bytes) -> str | None:
+        """ Upload a frame to the first on-line host and return its url """
+        image_name = f"{self.filename}.id_{number}"
+
+        # The same image is already on a host
+        digest = ScreenshotCache.digest(img_bytes)
+        if self.screenshot_cache:
+            img_url = self.screenshot_cache.url(digest, skip=self.offline_uploaders)
+            if img_url:
+                custom_console.bot_log(f"{img_url} (cached)")
+                return img_url
+
+        master_uploaders = [
+            ImgBB(img_bytes, self.IMGBB_KEY, image_name=image_name),
+            Freeimage(img_bytes, self.FREE_IMAGE_KEY,image_name=image_name),
+            PtScreens(img_bytes, self.PTSCREENS_KEY,image_name=image_name),
+            LensDump(img_bytes, self.LENSDUMP_KEY,image_name=image_name),
+            ImgFi(img_bytes, self.IMGFI_KEY,image_name=image_name),
+            PassIMA(img_bytes, self.PASSIMA_KEY, image_name=image_name),
+            ImaRide(img_bytes, self.IMARIDE_KEY, image_name=image_name),
+        ]
+
+        # Sorting list based on the observed performance and then on the priority
+        master_uploaders.sort(key=self.scoreboard.sort_key)
+        uploaders = [uploader for uploader in master_uploaders
+                     if uploader.__class__.__name__ not in self.offline_uploaders]
+
+        # for each on-line uploader
+        in_backoff = []
+        for uploader in uploaders:
+            if not self.scoreboard.allow(uploader.__class__.__name__):
+                in_backoff.append(uploader)
+                continue
+            img_url = self.upload_to(uploader, digest)
+            if img_url:
+                return img_url
+
+        # The hosts that failed in a previous run (e.g. a network outage) are the last chance, in priority order
+        if in_backoff:
+            custom_console.bot_warning_log("No image host available. Retry the hosts that failed recently")
+        for uploader in sorted(in_backoff, key=lambda uploader: uploader.priority):
+            img_url = self.upload_to(uploader, digest)
+            if img_url:
+                return img_url
+        return None
 
+    def upload_to(self, uploader: ImageUploader, digest: str) -> str | None:
+        """ Upload a frame to a host and record the result """
+        host = uploader.__class__.__name__
+        # Upload the screenshot
+        fallback_uploader = ImageUploaderFallback(uploader)
+        # Get a new URL
+        start = time.perf_counter()
+        img_url = fallback_uploader.upload()
+        self.scoreboard.record(host, ok=bool(img_url), latency=time.perf_counter() - start)
+
+        # If it goes offline during upload skip the uploader
+        if not img_url:
+            custom_console.bot_error_log(
+                "** Upload failed, skip to next host **"
+            )
+            self.offline_uploaders.add(host)
+            return None
+        custom_console.bot_log(img_url)
+        if self.screenshot_cache:
+            self.screenshot_cache.store(digest, host, img_url)
+        # Got the url for this screenshot
+        return img_url
 
     def description(self) -> str:
         description = "[center]\n"
-        console_url = []
-
-        custom_console.bot_log("Starting image upload..")
-        _number = 0
-        for img_bytes in self.extracted_frames:
-            _number = _number + 1
-            image_name = f"{self.filename}.id_{_number}"
-
-            master_uploaders = [
-                ImgBB(img_bytes, self.IMGBB_KEY, image_name=image_name),
-                Freeimage(img_bytes, self.FREE_IMAGE_KEY,image_name=image_name),
-                PtScreens(img_bytes, self.PTSCREENS_KEY,image_name=image_name),
-                LensDump(img_bytes, self.LENSDUMP_KEY,image_name=image_name),
-                ImgFi(img_bytes, self.IMGFI_KEY,image_name=image_name),
-                PassIMA(img_bytes, self.PASSIMA_KEY, image_name=image_name),
-                ImaRide(img_bytes, self.IMARIDE_KEY, image_name=image_name),
-            ]
-
-            # Sorting list based on priority
-            master_uploaders.sort(key=lambda uploader: uploader.priority)
-
-            # for each on-line uploader
-            for uploader in master_uploaders:
-                if not uploader.__class__.__name__ in self.offline_uploaders:
-                    # Upload the screenshot
-                    fallback_uploader = ImageUploaderFallback(uploader)
-                    # Get a new URL
-                    img_url = fallback_uploader.upload()
-
-                    # If it goes offline during upload skip the uploader
-                    if not img_url:
-                        custom_console.bot_error_log(
-                            "** Upload failed, skip to next host **"
-                        )
-                        self.offline_uploaders.append(uploader.__class__.__name__)
-                        continue
-                    custom_console.bot_log(img_url)
-                    # Append the URL to new description
-                    console_url.append(img_url)
-                    description += f"[url={img_url}][img=650]{img_url}[/img][/url]"
-                    # Got description for this screenshot
-                    break
+
+        urls: list[str | None]
+        if self.frame_urls:
+            urls = list(self.frame_urls)
+        else:
+            custom_console.bot_log("Starting image upload..")
+            frames = list(enumerate(self.extracted_frames, start=1))
+            with ThreadPoolExecutor(max_workers=max(1, config_settings.user_preferences.IMAGEHOST_WORKERS)) as executor:
+                # map() keeps the order of the frames
+                urls = list(executor.map(lambda frame: self.upload_frame(*frame), frames))
+
+            # Don't build a page without screenshots
+            missing = urls.count(None)
+            if frames and missing == len(frames):
+                custom_console.bot_error_log("No screenshot uploaded. Check the image host keys or your connection")
+                exit(1)
+            if missing:
+                custom_console.bot_error_log(f"{missing} of {len(frames)} screenshots not uploaded")
+
+        for img_url in urls:
+            if img_url:
+                # Append the URL to new description
+                description += f"[url={img_url}][img=650]{img_url}[/img][/url]"
 
         # Append the new URL to the description string
         description += "\n[/center]"
         return description
-
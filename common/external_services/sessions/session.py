@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
+import hashlib
 import json
+import os
+import time
+import zlib
 
 import httpx
 import diskcache as dc
 import logging
 from common.external_services.sessions.exceptions import exception_handler
+from common import config_settings
 from view import custom_console
 
 ENABLE_LOG = False
@@ -14,19 +19,25 @@ logging.getLogger("httpx").setLevel(logging.CRITICAL)
 class MyHttp:
     """Class to handle HTTP requests"""
 
-    def __init__(self, headers: dict, cache_dir: str = "http_cache"):
+    # The body is stored already decoded
+    _skip_headers = {"content-encoding", "content-length", "transfer-encoding"}
+
+    def __init__(self, headers: dict, cache_dir: str | None = None):
         self.session = httpx.Client(
             timeout=httpx.Timeout(30), headers=headers, verify=False
         )
         self.headers = headers
-        self.cache = dc.Cache(cache_dir)
+        if cache_dir is None:
+            cache_dir = os.path.join(config_settings.user_preferences.CACHE_PATH, "http.cache")
+        self.cache = dc.Cache(str(cache_dir), size_limit=config_settings.user_preferences.HTTP_CACHE_SIZE * 1024 ** 2,
+                              eviction_policy='least-recently-used')
 
     def get_session(self) -> httpx.Client:
         """Returns the HTTP session"""
         return self.session
 
     @staticmethod
-    def create_cache_key(url: str, params: dict) -> str:
+    def create_cache_key(url: str, params: dict, data: str | dict | None = None) -> str:
         """Generates the cache key based on the URL and query parameters (otherwise the resource is not updated in
         the cache.)"""
 
@@ -34,7 +45,44 @@ class MyHttp:
         # Sorted params to avoid duplicate
         if params:
             params = "&".join(f"{key}={val}" for key, val in sorted(params.items()))
-        return f"{url}?{params}"
+        # The body of a POST is part of the request
+        body = f"|{data}" if data else ""
+        # Hashed: the params contain the api keys
+        return hashlib.sha1(f"{url}?{params}{body}".encode()).hexdigest()
+
+    def _store(self, cache_key: str, response: httpx.Response, ttl: int | None) -> None:
+        """ Save a response compressed, with its validators and the time it has been stored """
+        self.cache[cache_key] = {
+            "status_code": response.status_code,
+            "headers": {key: val for key, val in response.headers.items() if key.lower() not in self._skip_headers},
+            "content": zlib.compress(response.content),
+            "stored_at": time.time(),
+            "ttl": ttl,
+        }
+
+    @staticmethod
+    def _to_response(entry: dict) -> httpx.Response:
+        return httpx.Response(
+            status_code=entry["status_code"],
+            headers=entry["headers"],
+            content=zlib.decompress(entry["content"]),
+        )
+
+    @staticmethod
+    def _is_fresh(entry: dict) -> bool:
+        # No ttl = valid until it is evicted
+        return entry["ttl"] is None or time.time() - entry["stored_at"] < entry["ttl"]
+
+    @staticmethod
+    def _validators(entry: dict) -> dict:
+        """ Headers for a conditional request, if the server sent ETag or Last-Modified """
+        headers = {}
+        entry_headers = {key.lower(): val for key, val in entry["headers"].items()}
+        if "etag" in entry_headers:
+            headers["If-None-Match"] = entry_headers["etag"]
+        if "last-modified" in entry_headers:
+            headers["If-Modified-Since"] = entry_headers["last-modified"]
+        return headers
 
     @exception_handler(log_errors=ENABLE_LOG)
     def get_url(
@@ -46,6 +94,7 @@ class MyHttp:
             body: json = json,
             use_cache: bool = False,
             get_method: bool = True,
+            ttl: int | None = None,
     ) -> httpx.Response:
         """
         GET request to the specified URL
@@ -56,34 +105,31 @@ class MyHttp:
             params (dict): The query parameters for the request
             get_method (bool): Defines the type of HTTP request (GET, POST) True= Get , False = Post
             body (JSON): Defines the body of the PUT request
+            ttl (int): Seconds a cached response is used without asking the server
 
         Returns:
             httpx.Response: The response object from the GET request
         """
-        cache_key = self.create_cache_key(url, params)
-
-        if use_cache and cache_key in self.cache:
-            response_data = self.cache[cache_key]
-            response = httpx.Response(
-                status_code=response_data["status_code"],
-                headers=response_data["headers"],
-                content=response_data["content"],
-            )
-            return response
+        cache_key = self.create_cache_key(url, params, None if get_method else data)
+        entry = self.cache.get(cache_key) if use_cache else None
+
+        if entry and self._is_fresh(entry):
+            return self._to_response(entry)
 
         if get_method:
-            # GET
-            response = self.session.get(url, params=params)
+            # GET. Revalidate a stale response when it is possible
+            validators = self._validators(entry) if entry else {}
+            response = self.session.get(url, params=params, headers=validators or None)
+            if entry and response.status_code == 304:
+                entry["stored_at"] = time.time()
+                self.cache[cache_key] = entry
+                return self._to_response(entry)
         else:
             # POST !
             response = self.session.post(url, params=params, headers=headers, data=data)
 
-        if use_cache:
-            self.cache[cache_key] = {
-                "status_code": response.status_code,
-                "headers": dict(response.headers),
-                "content": response.content,
-            }
+        if use_cache and response.status_code == 200:
+            self._store(cache_key, response, ttl)
 
         return response
 
@@ -95,6 +141,7 @@ class MyHttp:
             headers=None,
             data=None,
             use_cache: bool = False,
+            ttl: int | None = None,
     ) -> httpx.Response:
 
         """
@@ -104,19 +151,15 @@ class MyHttp:
             url (str): The URL to request
             use_cache (bool): Whether to use cached response if available
             params (dict): The query parameters for the request
+            ttl (int): Seconds a cached response is used without asking the server
         Returns:
             httpx.Response: The response object from the Post request
         """
-        cache_key = self.create_cache_key(url, params)
-
-        if use_cache and cache_key in self.cache:
-            response_data = self.cache[cache_key]
-            response = httpx.Response(
-                status_code=response_data["status_code"],
-                headers=response_data["headers"],
-                content=response_data["content"],
-            )
-            return response
+        cache_key = self.create_cache_key(url, params, data)
+        entry = self.cache.get(cache_key) if use_cache else None
+
+        if entry and self._is_fresh(entry):
+            return self._to_response(entry)
 
         try:
             response = self.session.post(url, params=params, headers=headers, data=data)
@@ -126,11 +169,7 @@ class MyHttp:
 
         if response.status_code==200:
             if use_cache:
-                self.cache[cache_key] = {
-                    "status_code": response.status_code,
-                    "headers": dict(response.headers),
-                    "content": response.content,
-                }
+                self._store(cache_key, response, ttl=ttl)
             return response
         else:
             custom_console.bot_error_log(f"{self.__class__.__name__}: {response.content}")
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 import os
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import diskcache
@@ -9,13 +11,15 @@ from typing import TypeVar
 from common.external_services.theMovieDB.core.models.tvshow.alternative import Alternative
 
 from common.external_services.theMovieDB.core.models.tvshow.translations import Translation
-from common.external_services.theMovieDB.core.models.movie.translations import Translation
+from common.external_services.theMovieDB.core.models.movie.translations import Translation, TranslationData
 from common.external_services.theMovieDB.core.models.tvshow.details import TVShowDetails
 from common.external_services.theMovieDB.core.models.movie.details import MovieDetails
 from common.external_services.theMovieDB.core.models.movie.nowplaying import NowPlaying
 from common.external_services.theMovieDB.core.models.tvshow.on_the_air import OnTheAir
 from common.external_services.theMovieDB.core.models.tvshow.tvshow import TvShow
 from common.external_services.theMovieDB.core.models.movie.movie import Movie
+from common.external_services.theMovieDB.core.enrichment import Enrichment, APPEND_TO_RESPONSE
+from common.external_services.theMovieDB.core.exports import TmdbIndex
 from common.external_services.theMovieDB.core.keywords import Keyword
 from common.external_services.theMovieDB.core.videos import Videos
 from common.external_services.mediaresult import MediaResult
@@ -33,74 +37,93 @@ from unit3dup import config_settings
 
 base_url = "https://api.themoviedb.org/3"
 ENABLE_LOG = True
+
+# Seconds a cached response is used before asking TMDB again
+SEARCH_TTL = 24 * 3600
+PLAYING_TTL = 6 * 3600
+DETAILS_TTL = 30 * 24 * 3600
 T = TypeVar('T')
 
 class MovieEndpoint:
     @staticmethod
     def search(query: str) -> dict:
-        return {'url': f'{base_url}/search/movie', 'datatype': Movie, 'query': query, 'results': 'results'}
+        return {'url': f'{base_url}/search/movie', 'datatype': Movie, 'query': query,
+                'results': 'results', 'ttl': SEARCH_TTL}
 
     @staticmethod
     def playing() -> dict:
-        return {'url': f'{base_url}/movie/now_playing', 'datatype': NowPlaying, 'query': '', 'results': 'results'}
+        return {'url': f'{base_url}/movie/now_playing', 'datatype': NowPlaying, 'query': '',
+                'results': 'results', 'ttl': PLAYING_TTL}
 
     @staticmethod
     def alternative(movie_id: int) -> dict:
         return {'url': f'{base_url}/movie/{movie_id}/alternative_titles', 'datatype': Alternative, 'query': '',
-                'results': 'titles'}
+                'results': 'titles', 'ttl': DETAILS_TTL}
 
     @staticmethod
     def translations(movie_id: int) -> dict:
         return {'url': f'{base_url}/movie/{movie_id}/translations', 'datatype': Translation, 'query': '',
-                'results': 'translations'}
+                'results': 'translations', 'ttl': DETAILS_TTL}
 
     @staticmethod
     def videos(movie_id: int) -> dict:
         return {'url': f'{base_url}/movie/{movie_id}/videos', 'datatype': Videos, 'query': '',
-                'results': 'results'}
+                'results': 'results', 'ttl': DETAILS_TTL}
 
     @staticmethod
     def details(movie_id: int) -> dict:
-        return {'url': f'{base_url}/movie/{movie_id}', 'datatype': MovieDetails, 'query': ''}
+        return {'url': f'{base_url}/movie/{movie_id}', 'datatype': MovieDetails, 'query': '', 'ttl': DETAILS_TTL}
 
     @staticmethod
     def keywords(movie_id: int) -> dict:
         return {'url': f'{base_url}/movie/{movie_id}/keywords', 'datatype': Keyword, 'query': '',
-                'results': 'keywords'}
+                'results': 'keywords', 'ttl': DETAILS_TTL}
+
+    @staticmethod
+    def enrichment(movie_id: int) -> dict:
+        return {'url': f'{base_url}/movie/{movie_id}', 'datatype': MovieDetails, 'query': '',
+                'append': APPEND_TO_RESPONSE, 'ttl': DETAILS_TTL}
 
 
 class TvEndpoint:
     @staticmethod
     def search(query: str):
-        return {'url': f'{base_url}/search/tv', 'datatype': TvShow, 'query': query, 'results': 'results'}
+        return {'url': f'{base_url}/search/tv', 'datatype': TvShow, 'query': query,
+                'results': 'results', 'ttl': SEARCH_TTL}
 
     @staticmethod
     def playing():
-        return {'url': f'{base_url}/tv/on_the_air', 'datatype': OnTheAir, 'query': '', 'results': 'results'}
+        return {'url': f'{base_url}/tv/on_the_air', 'datatype': OnTheAir, 'query': '',
+                'results': 'results', 'ttl': PLAYING_TTL}
 
     @staticmethod
     def alternative(serie_id: int) -> dict:
         return {'url': f'{base_url}/tv/{serie_id}/alternative_titles', 'datatype': Alternative, 'query': '',
-                'results': 'results'}
+                'results': 'results', 'ttl': DETAILS_TTL}
 
     @staticmethod
     def translations(serie_id: int) -> dict:
         return {'url': f'{base_url}/tv/{serie_id}/translations', 'datatype': Translation, 'query': '',
-                'results': 'translations'}
+                'results': 'translations', 'ttl': DETAILS_TTL}
 
     @staticmethod
     def videos(serie_id: int) -> dict:
         return {'url': f'{base_url}/tv/{serie_id}/videos', 'datatype': Videos, 'query': '',
-                'results': 'results'}
+                'results': 'results', 'ttl': DETAILS_TTL}
 
     @staticmethod
     def details(serie_id: int) -> dict:
-        return {'url': f'{base_url}/tv/{serie_id}', 'datatype': TVShowDetails, 'query': ''}
+        return {'url': f'{base_url}/tv/{serie_id}', 'datatype': TVShowDetails, 'query': '', 'ttl': DETAILS_TTL}
 
     @staticmethod
     def keywords(serie_id: int) -> dict:
         return {'url': f'{base_url}/tv/{serie_id}/keywords', 'datatype': Keyword, 'query': '',
-                'results': 'results'}
+                'results': 'results', 'ttl': DETAILS_TTL}
+
+    @staticmethod
+    def enrichment(serie_id: int) -> dict:
+        return {'url': f'{base_url}/tv/{serie_id}', 'datatype': TVShowDetails, 'query': '',
+                'append': APPEND_TO_RESPONSE, 'ttl': DETAILS_TTL}
 
 
 class TmdbAPI(MyHttp):
@@ -213,6 +236,25 @@ class TmdbAPI(MyHttp):
             print(f"Endpoint for category '{category}' not found.")
             return []
 
+    def enrichment(self, video_id: int, category: str) -> Enrichment | None:
+        """
+        Details, videos, keywords, alternative titles, translations and external ids in one request
+        :param video_id: id of the movie or tv show
+        :param category: 'movie' or 'tv'
+        :return: Enrichment or None
+        """
+        if endpoint_class := self.ENDPOINTS.get(category):
+            endpoint = endpoint_class.enrichment(video_id)
+            params = {**self.params, "append_to_response": endpoint['append']}
+            response = self.get_url(endpoint['url'], params=params,
+                                    use_cache=config_settings.user_preferences.HTTP_CACHE, ttl=endpoint['ttl'])
+            if response and response.status_code == 200:
+                return Enrichment.from_response(response.json(), endpoint['datatype'])
+            return None
+        else:
+            print(f"Endpoint for category '{category}' not found.")
+            return None
+
     def request(self, endpoint: dict) -> list[T] | None:
         """
         Sends a request to the API and returns a list of instances of the specified 'datatype'.
@@ -220,7 +262,8 @@ class TmdbAPI(MyHttp):
         :return: list of T or None
         """
         params = {**self.params, "query": endpoint['query']}
-        response = self.get_url(endpoint['url'], params=params)
+        response = self.get_url(endpoint['url'], params=params,
+                                use_cache=config_settings.user_preferences.HTTP_CACHE, ttl=endpoint['ttl'])
 
         if response:
             if response.status_code == 200:
@@ -236,18 +279,32 @@ class TmdbAPI(MyHttp):
 
 
 class DbOnline(TmdbAPI):
+    # Results shared by all the instances of a run. The episodes of a season make only one lookup
+    _memo: dict[tuple, MediaResult | None] = {}
+    # One event for each title being searched. The other workers wait for the first one
+    _in_flight: dict[tuple, threading.Event] = {}
+    _memo_lock = threading.Lock()
+
     def __init__(self, media: Media, category: str, no_title: str) -> None:
         super().__init__()
         self.media = media
         self.query = media.guess_title
         self.category = category
-        self.imdb_id = None
-        self.tvdb_id = None
+        self.imdb_id: str | None = None
+        self.tvdb_id: int | None = None
+        # One enrichment request for each candidate
+        self.enrichments: dict[int, Enrichment | None] = {}
 
         # Load the cache file
         if config_settings.user_preferences.CACHE_DBONLINE:
             self.cache = diskcache.Cache(str(os.path.join(config_settings.user_preferences.CACHE_PATH, "tmdb.cache")))
 
+        # Titles not found on TMDB are not searched again until the entry expires
+        self.negative_cache = None
+        if config_settings.user_preferences.TMDB_NEGATIVE_TTL > 0:
+            self.negative_cache = diskcache.Cache(str(os.path.join(config_settings.user_preferences.CACHE_PATH,
+                                                                   "tmdb_negative.cache")))
+
         if media.tmdb_id or media.imdb_id or media.tmdb_id:
             # Skip cache if there is a tmdb id or imdb in the title string
             self.media_result = self.results_in_string(tmdb_id=int(media.tmdb_id), imdb_id=int(media.imdb_id),
@@ -257,17 +314,61 @@ class DbOnline(TmdbAPI):
             # Search for a video based on the filename or the title from the -notitle flag in the CLI
             if no_title:
                 self.query = no_title
-            self.media_result = self.search()
+            self.media_result = self.memo_search()
 
     @staticmethod
     def hash_key(key: str) -> str:
         """ Generate a hashkey for the cache index """
         return hashlib.md5(key.encode('utf-8')).hexdigest()
 
-    def is_like(self, results: list[T]) -> T | bool:
+    def memo_key(self) -> tuple:
+        """ Normalized title, category and year: the same key for every episode of a show """
+        title = " ".join(ManageTitles.remove_accent(self.query.lower()).replace("-", " ").split())
+        return title, self.category, self.media.guess_filename.guessit_year
+
+    def memo_search(self) -> MediaResult | None:
+        """
+        Search each title only once per run
+
+        Concurrent workers asking for the same title wait for the first request and share its result.
+        If that search fails, the next waiting worker searches again
+        """
+        key = self.memo_key()
+        while True:
+            with DbOnline._memo_lock:
+                memoized = key in DbOnline._memo
+                search_results = DbOnline._memo.get(key)
+                event = DbOnline._in_flight.get(key)
+                if not memoized and event is None:
+                    DbOnline._in_flight[key] = threading.Event()
+                    break
+            if memoized:
+                if search_results:
+                    self.imdb_id = search_results.imdb_id
+                    self.tvdb_id = search_results.tvdb_id
+                    self.print_results(results=search_results)
+                return search_results
+            # Another worker is searching the same title
+            if event is not None:
+                event.wait()
+
+        try:
+            search_results = self.search()
+            with DbOnline._memo_lock:
+                DbOnline._memo[key] = search_results
+            return search_results
+        finally:
+            with DbOnline._memo_lock:
+                DbOnline._in_flight.pop(key).set()
+
+    def is_like(self, results: list[T]) -> T | None:
         if results:
-            # Search for in the tile or original_name
-            for result in results:
+            # Search for in the tile or original_name. All the candidates are scored in one call
+            titles = ManageTitles.fuzzy_scores(self.query, [ManageTitles.clean_text(result.get_title())
+                                                            for result in results])
+            originals = ManageTitles.fuzzy_scores(self.query, [ManageTitles.clean_text(result.get_original())
+                                                               for result in results])
+            for result, title_score, original_score in zip(results, titles, originals):
                 # check date
                 if result.get_date() and self.media.guess_filename.guessit_year:
                     if not datetime.strptime(result.get_date(),
@@ -275,30 +376,80 @@ class DbOnline(TmdbAPI):
                         continue
 
                 # Search for title
-                if ManageTitles.fuzzyit(str1=self.query, str2=ManageTitles.clean_text(result.get_title())) > 95:
+                if title_score > 95 or original_score > 95:
                     return result
 
-                if ManageTitles.fuzzyit(str1=self.query, str2=ManageTitles.clean_text(result.get_original())) > 95:
-                    return result
+            # Verify the candidates with the alternative titles and then with the translations.
+            # One enrichment request for each candidate on the shared client, the answers are checked
+            # in the original order
+            executor = ThreadPoolExecutor(max_workers=max(1, config_settings.user_preferences.TMDB_WORKERS))
+            try:
+                enrichments = [executor.submit(self.enrich, video_id=result.id) for result in results]
+
+                for result, future in zip(results, enrichments):
+                    enrichment = future.result()
+                    if enrichment:
+                        alternatives = [alt.title for alt in enrichment.alternatives]
+                        if ManageTitles.fuzzy_match(self.query, alternatives) is not None:
+                            return result
 
-            # Search for alternative title
-            for result in results:
-                alternative = self.alternative(media_id=result.id, category=self.category)
-                if alternative:
-                    for alt in alternative:
-                        if ManageTitles.fuzzyit(str1=self.query, str2=alt.title) > 95:
+                for result, future in zip(results, enrichments):
+                    enrichment = future.result()
+                    if enrichment:
+                        translated = [tr.data.name or tr.data.title for tr in enrichment.translations
+                                      if isinstance(tr.data, TranslationData)]
+                        if ManageTitles.fuzzy_match(self.query, [title for title in translated if title]) is not None:
                             return result
+            finally:
+                # A candidate has been found: drop the requests not started yet
+                executor.shutdown(wait=False, cancel_futures=True)
+        return None
 
-            for result in results:
-                translations = self.translations(media_id=result.id, category=self.category)
-                if translations:
-                    for tr in translations:
-                        if tr.data:
-                            title = tr.data.name or tr.data.title
-                            if title:
-                                if ManageTitles.fuzzyit(self.query, title) > 95:
-                                    return result
-        return False
+    def local_search(self) -> MovieDetails | TVShowDetails | None:
+        """ Match the title with the local TMDB index and verify the year with the enrichment """
+        if not config_settings.user_preferences.TMDB_INDEX:
+            return None
+
+        index = TmdbIndex(db_file=os.path.join(config_settings.user_preferences.CACHE_PATH, "tmdb_index.db"))
+        candidates = index.candidates(self.query, self.category)
+        scores = ManageTitles.fuzzy_scores(self.query, [ManageTitles.clean_text(title) for _, title, _ in candidates])
+        for (video_id, _, _), score in zip(candidates, scores):
+            if score <= 95:
+                continue
+
+            enrichment = self.enrich(video_id)
+            if not enrichment or not enrichment.details:
+                continue
+
+            # check date
+            details = enrichment.details
+            if details.get_date() and self.media.guess_filename.guessit_year:
+                if not datetime.strptime(details.get_date(),
+                                         '%Y-%m-%d').year == self.media.guess_filename.guessit_year:
+                    continue
+
+            custom_console.bot_warning_log(f"<> Title found in the local TMDB index")
+            return details
+        return None
+
+    def enrich(self, video_id: int) -> Enrichment | None:
+        """ Request the enrichment of a candidate only once """
+        if video_id not in self.enrichments:
+            self.enrichments[video_id] = self.enrichment(video_id=video_id, category=self.category)
+        return self.enrichments[video_id]
+
+    def external_ids(self, video_id: int) -> None:
+        """ IMDB and TVDB ids from TMDB. Search on TVDB only for what TMDB doesn't know """
+        enrichment = self.enrich(video_id) if video_id else None
+        if enrichment:
+            self.imdb_id = self.imdb_id or enrichment.imdb_id
+            self.tvdb_id = self.tvdb_id or enrichment.tvdb_id
+
+        if not self.imdb_id or (self.category == 'tv' and not self.tvdb_id):
+            tvdb_result = self.tvdb_search()
+            if tvdb_result:
+                self.tvdb_id = self.tvdb_id or tvdb_result.get('tvdb_id', None)
+                self.imdb_id = self.imdb_id or tvdb_result.get('imdb_id', None)
 
     def results_in_string(self, tmdb_id: int, imdb_id: int, tvdb_id: int) -> MediaResult:
         """
@@ -334,17 +485,26 @@ class DbOnline(TmdbAPI):
                 self.print_results(results=search_results)
                 return search_results
 
-        # or start an on-line search
-        results = self._search(self.query, self.category)
-        # Use imdb_id when tmdb_id is not available
-
-        tvdb_result = self.tvdb_search()
-        if tvdb_result:
-            self.tvdb_id = tvdb_result.get('tvdb_id', None)
-            self.imdb_id = tvdb_result.get('imdb_id', None)
+        # Resolve the title with the local index. Only the enrichment goes online
+        local_result = self.local_search()
+
+        # Skip the on-line search if TMDB didn't find the title recently
+        negative_key = self.hash_key(repr(self.memo_key()))
+        not_found = self.negative_cache is not None and negative_key in self.negative_cache
+        results: list | None
+        if local_result:
+            results = [local_result]
+        elif not_found:
+            custom_console.bot_warning_log(f"<> Title not found in a previous search. Skip TMDB")
+            results = []
+        else:
+            # or start an on-line search
+            results = self._search(self.query, self.category)
 
         if results:
-            if result := self.is_like(results):
+            if result := local_result or self.is_like(results):
+                # IMDB and TVDB ids
+                self.external_ids(result.id)
                 # Get the trailer
                 trailer_key = self.trailer(result.id)
                 keywords_list = self.keywords(result.id)
@@ -364,19 +524,30 @@ class DbOnline(TmdbAPI):
                 f"TMDB - No response from the remote host or the API key is invalid. Retry or update your key")
             exit(1)
 
+        # Remember the miss for TMDB_NEGATIVE_TTL hours
+        if self.negative_cache is not None and not not_found:
+            self.negative_cache.set(negative_key, self.query,
+                                    expire=config_settings.user_preferences.TMDB_NEGATIVE_TTL * 3600)
+
         # not results found so try to initialize imdb
-        custom_console.bot_warning_log(f"Title not found.What the bot has understood:")
-
-        custom_console.bot_warning_log(f"Title:   '{self.query}'\ncategory:'{self.category}'")
-        if self.category in 'tv':
-            serie = f"S{str(self.media.guess_season).zfill(2)}" if self.media.guess_season else ''
-            if not self.media.torrent_pack:
-                serie += f"E{str(self.media.guess_episode).zfill(2)}"
-            custom_console.bot_warning_log(f"details: '{serie}' Pack: '{self.media.torrent_pack}'")
-
-        # Ask User TMDB ID
-        search_results = self.manual_search()
-        self.cache[self.hash_key(self.query)] = search_results
+        # Use imdb_id when tmdb_id is not available
+        self.external_ids(0)
+
+        # The report and the question of a title together: the other workers wait to print their own
+        with custom_console.input_lock:
+            custom_console.bot_warning_log(f"Title not found.What the bot has understood:")
+
+            custom_console.bot_warning_log(f"Title:   '{self.query}'\ncategory:'{self.category}'")
+            if self.category in 'tv':
+                serie = f"S{str(self.media.guess_season).zfill(2)}" if self.media.guess_season else ''
+                if not self.media.torrent_pack:
+                    serie += f"E{str(self.media.guess_episode).zfill(2)}"
+                custom_console.bot_warning_log(f"details: '{serie}' Pack: '{self.media.torrent_pack}'")
+
+            # Ask User TMDB ID
+            search_results = self.manual_search()
+        if config_settings.user_preferences.CACHE_DBONLINE:
+            self.cache[self.hash_key(self.query)] = search_results
         return search_results
 
     def tvdb_search(self) -> dict | None:
@@ -391,48 +562,53 @@ class DbOnline(TmdbAPI):
                      MediaResult
         """
         user_id = 0
-        while True:
-            # Check if user wants to skip
-            if not config_settings.user_preferences.SKIP_TMDB:
-                try:
-                    user_id = custom_console.user_input(message=f"Please digit a valid TMDB ID (0=skip)->")
-                except KeyboardInterrupt:
-                    custom_console.bot_error_log("\nOperation cancelled")
-                    exit(0)
-            else:
-                custom_console.bot_warning_log(f"\n ** Auto skip TMDB ID **\n")
-
-            # Try to add IMDB ID if tmdb is not available
-            if user_id == 0:
-                # try searching for a YouTube video anyway
-                trailer_key = self.youtube_trailer()
-                search_results = MediaResult(video_id=user_id, imdb_id=self.imdb_id, trailer_key=trailer_key,
-                                             keywords_list='not available')
-                self.print_results(results=search_results)
-                return search_results
-            else:
-                result = self.search_id(video_id=user_id)
-                if result:
-                    # Request trailer and keywords
-                    trailer_key = self.trailer(user_id)
-                    keywords_list = self.keywords(user_id) if trailer_key else ''
-                    search_results = MediaResult(result=result, video_id=user_id, imdb_id=self.imdb_id,
-                                                 trailer_key=trailer_key,
-                                                 keywords_list=keywords_list)
+        # Until a valid id: the prompt is not mixed with the messages of the other titles
+        with custom_console.input_lock:
+            while True:
+                # Check if user wants to skip
+                if not config_settings.user_preferences.SKIP_TMDB:
+                    try:
+                        user_id = custom_console.user_input(message=f"Please digit a valid TMDB ID (0=skip)->")
+                    except KeyboardInterrupt:
+                        custom_console.bot_error_log("\nOperation cancelled")
+                        exit(0)
+                else:
+                    custom_console.bot_warning_log(f"\n ** Auto skip TMDB ID **\n")
+
+                # Try to add IMDB ID if tmdb is not available
+                if user_id == 0:
+                    # try searching for a YouTube video anyway
+                    trailer_key = self.youtube_trailer()
+                    search_results = MediaResult(video_id=user_id, imdb_id=self.imdb_id, trailer_key=trailer_key,
+                                                 keywords_list='not available')
                     self.print_results(results=search_results)
                     return search_results
-
-    def youtube_trailer(self) -> str | None:
+                else:
+                    result = self.search_id(video_id=user_id)
+                    if result:
+                        # Request trailer and keywords
+                        trailer_key = self.trailer(user_id)
+                        keywords_list = self.keywords(user_id) if trailer_key else ''
+                        search_results = MediaResult(result=result, video_id=user_id, imdb_id=self.imdb_id,
+                                                     trailer_key=trailer_key,
+                                                     keywords_list=keywords_list)
+                        self.print_results(results=search_results)
+                        return search_results
+
+    def youtube_trailer(self, video_id: int = 0) -> str | None:
         # Search trailer on YouTube
         if 'no_key' in config_settings.tracker_config.YOUTUBE_KEY:
             return "not available"
 
-        yt_trailer = YtTrailer(self.query)
-        result = yt_trailer.get_trailer_link()
-        if result:
-            # choose the first in the list
-            # todo compare against the media title especially for the favorite channel
-            return result[0].items[0].id.videoId
+        yt_trailer = YtTrailer(self.query, video_id=video_id)
+        # choose the first in the list
+        # todo compare against the media title especially for the favorite channel
+        trailer_id = yt_trailer.trailer_id()
+        if trailer_id:
+            return trailer_id
+        # Don't stop the batch when the daily quota is over
+        elif yt_trailer.over_quota:
+            return "not available"
         else:
             if not config_settings.user_preferences.SKIP_YOUTUBE:
                 user_youtube_id = custom_console.user_input_str(message="Title not found."
@@ -444,7 +620,8 @@ class DbOnline(TmdbAPI):
 
     def trailer(self, video_id: int) -> str | None:
         # Search for tmdb trailer
-        trailers = self._videos(video_id, self.category)
+        enrichment = self.enrich(video_id)
+        trailers = enrichment.videos if enrichment else self._videos(video_id, self.category)
         if trailers:
             trailer = next((video for video in trailers if video.type.lower() == 'trailer'
                             and video.site.lower() == 'youtube'), None)
@@ -454,10 +631,11 @@ class DbOnline(TmdbAPI):
                 return "not available"
 
         # Search for YouTube trailer
-        return self.youtube_trailer()
+        return self.youtube_trailer(video_id=video_id)
 
     def keywords(self, video_id: int) -> str | None:
-        keywords_list = self._keywords(video_id, self.category)
+        enrichment = self.enrich(video_id)
+        keywords_list = enrichment.keywords if enrichment else self._keywords(video_id, self.category)
         if keywords_list:
             return ",".join([key.name for key in keywords_list])
         else:
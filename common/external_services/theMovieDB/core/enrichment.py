@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from dataclasses import dataclass, field, fields
+from typing import Any
+
+from common.external_services.theMovieDB.core.models.tvshow.alternative import Alternative
+from common.external_services.theMovieDB.core.models.tvshow.details import TVShowDetails
+from common.external_services.theMovieDB.core.models.movie.details import MovieDetails
+from common.external_services.theMovieDB.core.models.movie.translations import Translation
+from common.external_services.theMovieDB.core.keywords import Keyword
+from common.external_services.theMovieDB.core.videos import Videos
+
+# Sections appended to the details request
+APPEND_TO_RESPONSE = "videos,keywords,alternative_titles,translations,external_ids"
+
+
+def build(datatype: Any, data: dict) -> Any:
+    """ Build a dataclass ignoring the fields it doesn't know. None if a required field is missing """
+    names = {attribute.name for attribute in fields(datatype)}
+    try:
+        return datatype(**{key: value for key, value in data.items() if key in names})
+    except TypeError:
+        return None
+
+
+@dataclass
+class Enrichment:
+    """ Details, videos, keywords, alternative titles, translations and external ids from a single request """
+    details: MovieDetails | TVShowDetails | None = None
+    videos: list[Videos] = field(default_factory=list)
+    keywords: list[Keyword] = field(default_factory=list)
+    alternatives: list[Alternative] = field(default_factory=list)
+    translations: list[Translation] = field(default_factory=list)
+    imdb_id: str | None = None
+    tvdb_id: int | None = None
+
+    @classmethod
+    def from_response(cls, data: dict, datatype: type[MovieDetails] | type[TVShowDetails]) -> "Enrichment":
+        """
+        Split the appended sections from the details
+
+        Args:
+            data: the json response of the details endpoint with append_to_response
+            datatype: MovieDetails or TVShowDetails
+        """
+        data = dict(data)
+        videos = data.pop("videos", {}) or {}
+        keywords = data.pop("keywords", {}) or {}
+        alternatives = data.pop("alternative_titles", {}) or {}
+        translations = data.pop("translations", {}) or {}
+        external_ids = data.pop("external_ids", {}) or {}
+
+        # Movie: 'keywords' and 'titles'. Tv: 'results'
+        keywords_list = keywords.get("keywords", keywords.get("results", []))
+        alternative_list = alternatives.get("titles", alternatives.get("results", []))
+
+        # No 'tt' like the ids from TVDB
+        imdb_id = external_ids.get("imdb_id") or data.get("imdb_id")
+
+        return cls(
+            details=build(datatype, data),
+            videos=[video for video in (build(Videos, item) for item in videos.get("results", [])) if video],
+            keywords=[key for key in (build(Keyword, item) for item in keywords_list) if key],
+            alternatives=[alt for alt in (build(Alternative, item) for item in alternative_list) if alt],
+            translations=[tr for tr in (build(Translation, item) for item in translations.get("translations", []))
+                          if tr],
+            imdb_id=imdb_id.lower().replace("tt", "") if imdb_id else None,
+            tvdb_id=external_ids.get("tvdb_id"),
+        )
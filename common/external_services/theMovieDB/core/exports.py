@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import gzip
+import json
+import sqlite3
+
+# Titles
+create_table_sql = ('\n'
+                    'CREATE TABLE IF NOT EXISTS titles (\n'
+                    '    id INTEGER NOT NULL,\n'
+                    '    category TEXT NOT NULL,\n'
+                    '    title TEXT NOT NULL,\n'
+                    '    popularity REAL,\n'
+                    '    PRIMARY KEY (category, id)\n'
+                    ')\n')
+
+# Full text index over the titles table
+create_fts_sql = ("CREATE VIRTUAL TABLE IF NOT EXISTS titles_fts USING fts5("
+                  "title, content='titles', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')")
+
+
+class TmdbIndex:
+    """
+    Local index of the TMDB daily id exports
+
+    The exports are gzipped JSONL files, one title for each line:
+
+        {"adult":false,"id":603,"original_title":"The Matrix","popularity":61.4,"video":false}
+        {"id":1399,"original_name":"Game of Thrones","popularity":369.6}
+
+    'original_title' marks a movie export, 'original_name' a tv series export.
+    Build the index from a file and look up candidates without any network request:
+
+        index = TmdbIndex(db_file="tmdb_index.db")
+        index.load("movie_ids_05_15_2025.json.gz")
+        index.candidates("the matrix", category="movie")
+    """
+
+    BATCH = 10000
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+
+    def connect(self) -> sqlite3.Connection:
+        database = sqlite3.connect(self.db_file)
+        database.execute(create_table_sql)
+        database.execute(create_fts_sql)
+        return database
+
+    def exists(self) -> bool:
+        return os.path.exists(self.db_file)
+
+    @staticmethod
+    def parse(line: str) -> tuple[int, str, str, float] | None:
+        """ Id, category, title and popularity of an export line. None if the line is not valid """
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(item, dict) or 'id' not in item:
+            return None
+        if item.get('original_title'):
+            return item['id'], 'movie', item['original_title'], item.get('popularity', 0)
+        if item.get('original_name'):
+            return item['id'], 'tv', item['original_name'], item.get('popularity', 0)
+        return None
+
+    def load(self, export_file: str) -> dict[str, int]:
+        """
+        Replace the titles of the export category with the titles in the file
+
+        Args:
+            export_file: a TMDB id export, gzipped or plain JSONL
+
+        Returns:
+            the number of titles imported for each category
+        """
+        opener = gzip.open if export_file.endswith('.gz') else open
+        counters: dict[str, int] = {}
+        database = self.connect()
+        try:
+            with opener(export_file, 'rt', encoding='utf-8') as export:
+                batch = []
+                for line in export:
+                    row = self.parse(line)
+                    if not row:
+                        continue
+                    # A new export replaces the previous one of the same category
+                    if row[1] not in counters:
+                        database.execute("DELETE FROM titles WHERE category = ?", (row[1],))
+                        counters[row[1]] = 0
+                    counters[row[1]] += 1
+                    batch.append(row)
+                    if len(batch) >= self.BATCH:
+                        database.executemany("INSERT OR REPLACE INTO titles VALUES (?, ?, ?, ?)", batch)
+                        batch.clear()
+                if batch:
+                    database.executemany("INSERT OR REPLACE INTO titles VALUES (?, ?, ?, ?)", batch)
+            database.execute("INSERT INTO titles_fts(titles_fts) VALUES('rebuild')")
+            database.commit()
+        finally:
+            database.close()
+        return counters
+
+    def candidates(self, query: str, category: str, limit: int = 20) -> list[tuple[int, str, float]]:
+        """
+        Titles with every word of the query, the most popular first
+
+        Returns:
+            a list of (tmdb id, original title, popularity)
+        """
+        words = re.findall(r"\w+", query.lower())
+        if not words or not self.exists():
+            return []
+
+        match = " ".join(f'"{word}"' for word in words)
+        database = self.connect()
+        try:
+            return database.execute("SELECT titles.id, titles.title, titles.popularity FROM titles_fts "
+                                    "JOIN titles ON titles.rowid = titles_fts.rowid "
+                                    "WHERE titles_fts MATCH ? AND titles.category = ? "
+                                    "ORDER BY titles.popularity DESC LIMIT ?", (match, category, limit)).fetchall()
+        finally:
+            database.close()
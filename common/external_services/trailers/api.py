@@ -1,16 +1,40 @@
 # -*- coding: utf-8 -*-
+import os
+from datetime import datetime, timedelta, timezone, tzinfo
 
+import diskcache
 import requests
 from .response import YouTubeSearchResponse, Thumbnails, Id, Item, PageInfo, Snippet
 
 from common import config_settings
 from view import custom_console
 
+# Quota units of a search request
+SEARCH_COST = 100
+
+# Seconds a search without results is not repeated
+NEGATIVE_TTL = 7 * 24 * 3600
+
+# The YouTube quota is reset at midnight Pacific Time
+QUOTA_TIMEZONE: tzinfo
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except (ImportError, KeyError):
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+
 class YtTrailer:
     url = 'https://www.googleapis.com/youtube/v3/search'
 
-    def __init__(self, title: str):
+    def __init__(self, title: str, video_id: int = 0):
         self.title = title
+        # TMDB id: the same trailer for every title of the same show
+        self.video_id = video_id
+        # True if the search has been skipped to stay within the daily quota
+        self.over_quota = False
+        self.status_code: int | None = None
+        self.cache = diskcache.Cache(str(os.path.join(config_settings.user_preferences.CACHE_PATH, "youtube.cache")))
         self.params = {
             'part': 'snippet',
             'q': f'{title} trailer',
@@ -20,6 +44,55 @@ class YtTrailer:
             'maxResults': 3,
         }
 
+    def cache_key(self) -> str:
+        """ TMDB id or normalized title, and the channel """
+        media = f"tmdb:{self.video_id}" if self.video_id else f"title:{' '.join(self.title.lower().split())}"
+        channel = config_settings.user_preferences.YOUTUBE_FAV_CHANNEL_ID \
+            if config_settings.user_preferences.YOUTUBE_CHANNEL_ENABLE else ''
+        return f"{media}|{channel}"
+
+    @staticmethod
+    def quota_key() -> str:
+        return f"quota|{datetime.now(QUOTA_TIMEZONE).date()}"
+
+    def spend_quota(self) -> bool:
+        """ Reserve the units of a search. False if the daily budget is over """
+        with self.cache.transact():
+            used = self.cache.get(self.quota_key(), 0)
+            if used + SEARCH_COST > config_settings.user_preferences.YOUTUBE_DAILY_QUOTA:
+                return False
+            self.cache.set(self.quota_key(), used + SEARCH_COST, expire=2 * 24 * 3600)
+        return True
+
+    def trailer_id(self) -> str | None:
+        """
+        The video id of the first result, from the cache or from a search
+
+        Returns:
+            None if there is no trailer or if the quota is over (over_quota = True)
+        """
+        key = self.cache_key()
+        if key in self.cache:
+            # An empty string is a search without results
+            return self.cache[key] or None
+
+        if not self.spend_quota():
+            custom_console.bot_warning_log("YouTube daily quota reached. Trailer search skipped")
+            self.over_quota = True
+            return None
+
+        result = self.get_trailer_link()
+        if self.over_quota:
+            return None
+        if result:
+            trailer_id = result[0].items[0].id.videoId
+            self.cache[key] = trailer_id
+            return trailer_id
+        # Remember only a search without results, not a failed request
+        if self.status_code == 200:
+            self.cache.set(key, '', expire=NEGATIVE_TTL)
+        return None
+
     def get_trailer_link(self) -> list[YouTubeSearchResponse] | None:
 
         # Use a favorite channel if the flag is True
@@ -27,7 +100,16 @@ class YtTrailer:
         if config_settings.user_preferences.YOUTUBE_CHANNEL_ENABLE:
             self.params['channelId'] = config_settings.user_preferences.YOUTUBE_FAV_CHANNEL_ID
 
-        response = requests.get(self.url, params=self.params)
+        response = requests.get(self.url, params=self.params, timeout=30)
+        self.status_code = response.status_code
+
+        # Quota exceeded before the budget: no more searches today
+        if response.status_code == 403 and 'quota' in response.text.lower():
+            self.cache.set(self.quota_key(), config_settings.user_preferences.YOUTUBE_DAILY_QUOTA,
+                           expire=2 * 24 * 3600)
+            custom_console.bot_warning_log("YouTube daily quota exceeded. Trailer search skipped")
+            self.over_quota = True
+            return None
 
         if response.status_code == 200:
             response_data = response.json()
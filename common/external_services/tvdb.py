@@ -18,22 +18,22 @@ class TVDB:
             show_type='movie'
         results = self.api.search(query=query, type=show_type)
         self.filtered_results = [item for item in results]
-        for item in self.filtered_results:
-            title = item.get('name', '') or item.get('extended_title', '')
+        # Score all the names and the italian translations in one call
+        names = ManageTitles.fuzzy_scores(query, [item.get('name', '') or item.get('extended_title', '')
+                                                  for item in self.filtered_results])
+        titles_ita = ManageTitles.fuzzy_scores(query, [(item.get('translations') or {}).get('ita') or ''
+                                                       for item in self.filtered_results])
+        for item, score, score_ita in zip(self.filtered_results, names, titles_ita):
             translations = item.get('translations', [])
             remote_ids = item.get('remote_ids', [])
             imdb_id = None
             for remote_id in remote_ids:
                 if 'IMDB' in remote_id.get('sourceName').upper():
                     imdb_id = remote_id.get('id').lower().replace('tt', '')
-            score = ManageTitles.fuzzyit(str1=query, str2=title)
             if score > 95:
                 return {'tvdb_id' : item.get('tvdb_id'), 'imdb_id': imdb_id}
-            if translations:
-                title_ita = translations.get('ita', None)
-                if title_ita:
-                    score = ManageTitles.fuzzyit(str1=query, str2=title_ita)
-                    if score > 95:
-                        return {'tvdb_id': item.get('tvdb_id'), 'imdb_id': imdb_id}
+            if translations and translations.get('ita', None):
+                if score_ita > 95:
+                    return {'tvdb_id': item.get('tvdb_id'), 'imdb_id': imdb_id}
 
         return None
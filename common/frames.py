@@ -1,15 +1,44 @@
 # -*- coding: utf-8 -*-
 import os
 import subprocess
+import threading
 import io
 
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from pathlib import Path
 from PIL import Image
 
 from common import config_settings
 from view import custom_console
 
+def encode_png(image: Image, resize: bool, compress_level: int, width: int = 650) -> bytes:
+    """
+    Worker: resize the image (if requested) and convert it to PNG bytes
+
+    It runs in a process pool, so the settings are passed as arguments
+    """
+    if resize:
+        aspect_ratio = image.width / image.height
+        height = round(width / aspect_ratio)
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+    buffered = io.BytesIO()
+    image.save(buffered, format="PNG", optimize=True, compress_level=compress_level)
+    return buffered.getvalue()
+
+
 class VideoFrame:
+
+    # One process pool for the whole run, shared by every video
+    _pool: ProcessPoolExecutor | None = None
+    _pool_lock = threading.Lock()
+
+    @classmethod
+    def pool(cls) -> ProcessPoolExecutor:
+        with cls._pool_lock:
+            if cls._pool is None:
+                cls._pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+            return cls._pool
+
     def __init__(self, video_path: str, num_screenshots: int):
         """
         Initialize VideoFrame object
@@ -28,49 +57,16 @@ class VideoFrame:
         :return: A list of screenshots in bytes and a flag indicating if any screenshot is HD
         """
         frames = self._extract()
-        frames_in_bytes = []
-        is_hd = 0
-
-        for idx, frame in enumerate(frames):
-            img_bytes = self.image_to_bytes(frame=frame)
-            is_hd = 0 if frame.height >= 720 else 1
-            frames_in_bytes.append(img_bytes)
-
-        return frames_in_bytes, is_hd
+        is_hd = 0 if frames and frames[-1].height >= 720 else 1
 
-    def image_to_bytes(self, frame: Image) -> bytes:
-        """
-        Convert an image to bytes
-
-        :param frame: The image to convert
-        :return: Image in bytes
-        :compress_level: compressione level (0-9); 9=Max; default=4 ; 0 = best
-        """
-        image = self.resize_image(frame)
-        buffered = io.BytesIO()
+        # LANCZOS and PNG optimize use one core for each image
         user_compress_level: int = config_settings.user_preferences.COMPRESS_SCSHOT\
             if 0 <= config_settings.user_preferences.COMPRESS_SCSHOT <= 9 else 4
-        image.save(
-            buffered, format="PNG", optimize=True, compress_level=user_compress_level
-        )
-        return buffered.getvalue()
-
-    @staticmethod
-    def resize_image(image: Image, width: int = 650) -> Image:
-        """
-        Resize the image while maintaining aspect ratio
+        frames_in_bytes = list(self.pool().map(encode_png, frames,
+                                               [config_settings.user_preferences.RESIZE_SCSHOT] * len(frames),
+                                               [user_compress_level] * len(frames)))
 
-        :param image: The image to resize
-        :param width: The width to resize to
-        :return: Resized image
-        """
-        if config_settings.user_preferences.RESIZE_SCSHOT:
-            aspect_ratio = image.width / image.height
-            height = round(width / aspect_ratio)
-            resized_image = image.resize((width, height), Image.Resampling.LANCZOS)
-            return resized_image
-        else:
-            return image
+        return frames_in_bytes, is_hd
 
     def _extract(self):
         """
@@ -85,10 +81,13 @@ class VideoFrame:
         duration_step = interval // self.num_screenshots
         min_time = int(min_time)
         max_time = int(max_time)
-        frames = [self._extract_frame(time) for time in range(min_time + duration_step, max_time, duration_step)]
+        times = list(range(min_time + duration_step, max_time, duration_step))
+        if len(times) < self.num_screenshots:
+            times.append(max_time)
 
-        if len(frames) < self.num_screenshots:
-            frames.append(self._extract_frame(max_time))
+        # One ffmpeg for each frame, a few at a time. map() keeps the order of the timestamps
+        with ThreadPoolExecutor(max_workers=max(1, config_settings.user_preferences.FFMPEG_WORKERS)) as executor:
+            frames = list(executor.map(self._extract_frame, times))
         return frames
 
     def _get_video_duration(self) -> float:
@@ -1,38 +1,87 @@
 # -*- coding: utf-8 -*-
 import re
 import os
+import threading
+from collections import OrderedDict
 
+import diskcache
 from pymediainfo import MediaInfo
+
 from common.utility import ManageTitles
+from common import config_settings
 
 class MediaFile:
     """
     Get attributes from mediainfo
+
+    The XML and the text reports are parsed once per file: the latest ones are kept in memory and,
+    with CACHE_MEDIAINFO, on disk keyed by (path, size, mtime)
     """
+
+    # Reports parsed during this run, the least recently used is dropped beyond _reports_size
+    _reports: OrderedDict[str, dict] = OrderedDict()
+    _reports_size = 64
+    _lock = threading.Lock()
+
     def __init__(self, file_path: str):
         self.file_path = file_path
 
         self._video_info: list = []
         self._general_track: dict = {}
         self._audio_info: list = []
+        self._subtitle_info: list | None = None
         self._encoding_settings: str | None = None
 
-        try:
-            self.media_info = MediaInfo.parse(self.file_path)
-        except OSError as e:
-            if os.name != 'nt':
-                print(f"{e} Try to install: sudo apt-get install -y libmediainfo-dev")
-            exit(1)
+        stat = os.stat(self.file_path)
+        self.key = f"{os.path.abspath(self.file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        self.cache = diskcache.Cache(str(os.path.join(config_settings.user_preferences.CACHE_PATH, "mediainfo.cache")))\
+            if config_settings.user_preferences.CACHE_MEDIAINFO else None
+
+        report = self._report()
+        if 'xml' not in report or 'text' not in report:
+            try:
+                report.update(self._parse(self.file_path))
+            except OSError as e:
+                if os.name != 'nt':
+                    print(f"{e} Try to install: sudo apt-get install -y libmediainfo-dev")
+                exit(1)
+            self._save(report)
+        self.media_info = MediaInfo(report['xml'])
+        self._text: str = report['text']
 
+    @staticmethod
+    def _parse(file_path: str) -> dict:
+        """
+        The XML report (complete) builds the tracks, the text report (not complete) is the one shown
+        in the description
+        """
+        return {'xml': MediaInfo.parse(file_path, output="OLDXML"),
+                'text': MediaInfo.parse(file_path, output="STRING", full=False)}
+
+    def _report(self) -> dict:
+        """ The reports of this file already parsed in this run or in a previous one """
+        with MediaFile._lock:
+            report = MediaFile._reports.pop(self.key, None)
+            if report is None:
+                report = self.cache.get(self.key, {}) if self.cache is not None else {}
+            # Most recently used last: the oldest report leaves the memo first
+            MediaFile._reports[self.key] = report
+            while len(MediaFile._reports) > MediaFile._reports_size:
+                MediaFile._reports.popitem(last=False)
+            return report
+
+    def _save(self, report: dict) -> None:
+        if self.cache is not None:
+            self.cache[self.key] = report
 
     @property
     def general_track(self)-> dict:
         """Returns general information"""
         if not self._general_track:
-            for track in self.media_info.to_data().get("tracks", []):
-                if track.get("track_type") == "General":
-                    return self._general_track
-            self._general_track = {}
+            for track in self.media_info.tracks:
+                if track.track_type == "General":
+                    self._general_track = track.to_data()
+                    break
         return self._general_track
 
     @property
@@ -145,11 +194,12 @@ class MediaFile:
     @property
     def subtitle_track(self) -> list:
         """Get subtitle track"""
-        subtitle_info = []
-        for track in self.media_info.tracks:
-            if track.track_type == "Text":
-                subtitle_info.append(track.to_data())
-        return subtitle_info
+        if self._subtitle_info is None:
+            self._subtitle_info = []
+            for track in self.media_info.tracks:
+                if track.track_type == "Text":
+                    self._subtitle_info.append(track.to_data())
+        return self._subtitle_info
 
     @property
     def available_languages(self) -> list:
@@ -175,7 +225,8 @@ class MediaFile:
 
     @property
     def info(self):
-        return MediaInfo.parse(self.file_path, output="STRING", full=False)
+        """ The text report shown in the description """
+        return self._text
 
     @property
     def encode_settings(self):
@@ -157,6 +157,30 @@ class UserPreferences(BaseModel):
     MY_TEXT_1: str | None = None
     MY_TEXT_2: str | None = None
     MY_TEXT_3: str | None = None
+    PIPELINE_QUEUE_SIZE: int = 2
+    PIPELINE_HASH_WORKERS: int = 1
+    PIPELINE_METADATA_WORKERS: int = 2
+    PIPELINE_SCREENSHOT_WORKERS: int = 1
+    PIPELINE_IMAGEHOST_WORKERS: int = 2
+    PIPELINE_UPLOAD_WORKERS: int = 1
+    CACHE_PIECES: bool = True
+    CACHE_PIECES_SIZE: int = 64
+    HASH_ENGINE: str | None = "process"
+    HASH_WORKERS: int = 0
+    FFMPEG_WORKERS: int = 4
+    IMAGEHOST_WORKERS: int = 4
+    IMAGEHOST_HOST_LIMIT: int = 2
+    IMAGEHOST_URL_TTL: int = 30
+    CACHE_MEDIAINFO: bool = True
+    TMDB_WORKERS: int = 8
+    HTTP_CACHE: bool = True
+    HTTP_CACHE_SIZE: int = 128
+    TMDB_NEGATIVE_TTL: int = 24
+    TMDB_INDEX: bool = True
+    CACHE_GUESSIT: bool = False
+    YOUTUBE_DAILY_QUOTA: int = 10000
+    TRACKER_POOL_SIZE: int = 4
+    TRACKER_MIRROR: bool = False
 
 class Options(BaseModel):
     FTPX_USER: str = "user"
@@ -398,6 +422,8 @@ class Validate:
         """
         Validates boolean
         """
+        if isinstance(value, bool):
+            return value
         if isinstance(value, str):
             normalized_value = value.strip().lower()
             if normalized_value in {"true", "1", "yes"}:
@@ -479,15 +505,21 @@ class Config(BaseModel):
                 field = field.upper()
 
                 if field in ['DUPLICATE_ON', 'SKIP_DUPLICATE', 'SKIP_TMDB', 'SKIP_YOUTUBE', 'RESIZE_SCSHOT', 'ANON',
-                             'WEBP_ENABLED', 'CACHE_SCR', 'CACHE_DBONLINE', 'PERSONAL_RELEASE']:
+                             'WEBP_ENABLED', 'CACHE_SCR', 'CACHE_DBONLINE', 'PERSONAL_RELEASE', 'CACHE_PIECES',
+                             'CACHE_MEDIAINFO', 'HTTP_CACHE', 'TMDB_INDEX', 'CACHE_GUESSIT',
+                             'TRACKER_MIRROR']:
                     section[field] = Validate.boolean(value=section[field], field_name=field)
 
-                if field in ['TORRENT_COMMENT', 'WATCHER_PATH', 'DEFAULT_TRACKER']:
+                if field in ['TORRENT_COMMENT', 'WATCHER_PATH', 'DEFAULT_TRACKER', 'HASH_ENGINE']:
                     section[field] = Validate.string(value=section[field], field_name=field)
 
                 if field in ['NUMBER_OF_SCREENSHOTS', 'COMPRESS_SCSHOT', 'IMGBB_PRIORITY', 'FREE_IMAGE_PRIORITY',
                              'LENSDUMP_PRIORITY', 'PASSIMA_PRIORITY', 'IMARIDE_PRIORITY', 'WATCHER_INTERVAL', 'SIZE_TH',
-                             'FAST_LOAD']:
+                             'FAST_LOAD', 'PIPELINE_QUEUE_SIZE', 'PIPELINE_HASH_WORKERS', 'PIPELINE_METADATA_WORKERS',
+                             'PIPELINE_SCREENSHOT_WORKERS', 'PIPELINE_IMAGEHOST_WORKERS', 'PIPELINE_UPLOAD_WORKERS',
+                             'CACHE_PIECES_SIZE', 'HASH_WORKERS', 'FFMPEG_WORKERS', 'IMAGEHOST_WORKERS',
+                             'IMAGEHOST_HOST_LIMIT', 'IMAGEHOST_URL_TTL', 'TMDB_WORKERS', 'HTTP_CACHE_SIZE',
+                             'TMDB_NEGATIVE_TTL', 'YOUTUBE_DAILY_QUOTA', 'TRACKER_POOL_SIZE']:
                     section[field] = Validate.integer(value=section[field], field_name=field)
 
                 if field == 'PREFERRED_LANG':
@@ -680,7 +712,31 @@ class Load:
                 "MY_TEXT_1": "",
                 "MY_TEXT_2": "",
                 "MY_TEXT_3": "",
-                "MY_TEXT_H": "[center]━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━[/center]"
+                "MY_TEXT_H": "[center]━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━[/center]",
+                "PIPELINE_QUEUE_SIZE": 2,
+                "PIPELINE_HASH_WORKERS": 1,
+                "PIPELINE_METADATA_WORKERS": 2,
+                "PIPELINE_SCREENSHOT_WORKERS": 1,
+                "PIPELINE_IMAGEHOST_WORKERS": 2,
+                "PIPELINE_UPLOAD_WORKERS": 1,
+                "CACHE_PIECES": "True",
+                "CACHE_PIECES_SIZE": 64,
+                "HASH_ENGINE": "process",
+                "HASH_WORKERS": 0,
+                "FFMPEG_WORKERS": 4,
+                "IMAGEHOST_WORKERS": 4,
+                "IMAGEHOST_HOST_LIMIT": 2,
+                "IMAGEHOST_URL_TTL": 30,
+                "CACHE_MEDIAINFO": "True",
+                "TMDB_WORKERS": 8,
+                "HTTP_CACHE": "True",
+                "HTTP_CACHE_SIZE": 128,
+                "TMDB_NEGATIVE_TTL": 24,
+                "TMDB_INDEX": "True",
+                "CACHE_GUESSIT": "False",
+                "YOUTUBE_DAILY_QUOTA": 10000,
+                "TRACKER_POOL_SIZE": 4,
+                "TRACKER_MIRROR": "False",
             },
             "options": {
                 "FTPX_USER": "user",
@@ -818,7 +874,11 @@ class JsonConfig:
         # Add the new attributes in 'user preferences'
         if self.user_preferences_diff_keys:
             self.updated = True
-            missing_keys_dict = {key: '' for key in self.user_preferences_diff_keys}
+            # Use the default value when there is one, so numbers and flags pass the validation
+            missing_keys_dict = {key: UserPreferences.model_fields[key].default
+                                 if key in UserPreferences.model_fields
+                                    and UserPreferences.model_fields[key].default is not None else ''
+                                 for key in self.user_preferences_diff_keys}
             self.user_preferences_config.update(missing_keys_dict)
 
     def update_options_config(self):
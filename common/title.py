@@ -1,13 +1,75 @@
 # -*- coding: utf-8 -*-
+import os
+import threading
 import guessit
+import diskcache
+
+from functools import lru_cache
+
 from common.utility import ManageTitles
+from common import config_settings
+
+# Counters for profiling: parse calls, answers from the persistent cache and real guessit runs
+counters = {"calls": 0, "disk_hits": 0, "misses": 0}
+_counters_lock = threading.Lock()
+_disk_cache = None
+
+
+def _count(name: str) -> None:
+    with _counters_lock:
+        counters[name] += 1
+
+
+def _persistent_cache() -> diskcache.Cache | None:
+    """ Open the persistent cache once. None if it is disabled """
+    global _disk_cache
+    if config_settings.user_preferences.CACHE_GUESSIT and _disk_cache is None:
+        _disk_cache = diskcache.Cache(str(os.path.join(config_settings.user_preferences.CACHE_PATH, "guessit.cache")))
+    return _disk_cache
+
+
+@lru_cache(maxsize=4096)
+def _parse(name: str, options: tuple) -> dict:
+    cache = _persistent_cache()
+    # The same name can be parsed in a different way by another guessit version
+    key = f"{guessit.__version__}|{options}|{name}"
+    if cache is not None:
+        result = cache.get(key)
+        if result is not None:
+            _count("disk_hits")
+            return result
+
+    _count("misses")
+    # A plain dict: the MatchesDict from guessit can't be pickled
+    result = dict(guessit.guessit(name, dict(options)))
+    if cache is not None:
+        cache[key] = result
+    return result
+
+
+def parse(name: str, options: dict | None = None) -> dict:
+    """
+    guessit.guessit memoized by name and options for the whole process
+
+    The same result is shared by all the callers: read it, don't modify it
+    """
+    _count("calls")
+    return _parse(name, tuple(sorted((options or {}).items())))
+
+
+def stats() -> dict[str, int]:
+    """ Calls, memory hits, persistent cache hits and guessit runs """
+    with _counters_lock:
+        result = dict(counters)
+    result["memory_hits"] = _parse.cache_info().hits
+    return result
 
 
 class Guessit:
 
     def __init__(self, filename: str):
         temp_name = ManageTitles.replace(filename)
-        self.guessit = guessit.guessit(temp_name)
+        self.guessit = parse(temp_name)
         self.filename = filename
 
     @property
@@ -65,7 +127,7 @@ class Guessit:
         Get the episode title
         :return:
         """
-        return guessit.guessit(self.filename, {"excludes": "part"}).get("episode_title", "")
+        return parse(self.filename, {"excludes": "part"}).get("episode_title", "")
 
 
     @property
@@ -255,4 +255,4 @@ ast_data = {
                 "nvenc",
                 "bluray",
             ],
-}
\ No newline at end of file
+}
@@ -1,9 +1,21 @@
 # -*- coding: utf-8 -*-
+import math
 
 from dataclasses import dataclass
 from common.utility import ManageTitles
 from . import tracker_list
 
+# Piece size = smallest power of two that keeps the pieces under max_pieces, between min and max bytes.
+# A tracker module overrides only the keys where its rules differ
+DEFAULT_PIECE_SIZE = {"min": 32768,
+                      "max": 16777216,
+                      "max_pieces": 2048}
+
+# UNIT3D api throttle: requests in a window of seconds. A tracker module can set its own RATE_LIMIT
+DEFAULT_RATE_LIMIT = {"requests": 30,
+                      "per": 60}
+
+
 @dataclass
 class TRACKData:
     category: dict[str, int]
@@ -11,13 +23,15 @@ class TRACKData:
     type_id: dict[str, int]
     resolution: dict[str, int]
     codec: list
+    piece_size: dict[str, int]
+    rate_limit: dict[str, int]
 
     @classmethod
     def load_from_module(cls, tracker_name: str) -> "TRACKData":
         """
         Load tracker data from module
         """
-        tracker_data= tracker_list[tracker_name.upper()]
+        tracker_data: dict = tracker_list[tracker_name.upper()]
 
         return cls(
             category=tracker_data.get("CATEGORY"),
@@ -25,8 +39,23 @@ class TRACKData:
             type_id=tracker_data.get("TYPE_ID"),
             resolution=tracker_data.get("RESOLUTION"),
             codec=tracker_data.get("CODEC"),
+            piece_size={**DEFAULT_PIECE_SIZE, **tracker_data.get("PIECE_SIZE", {})},
+            rate_limit={**DEFAULT_RATE_LIMIT, **tracker_data.get("RATE_LIMIT", {})},
         )
 
+    def select_piece_size(self, size: int) -> int:
+        """
+        Choose the piece size from the total size of the content
+
+        Small contents get more pieces, big contents don't go over max_pieces
+        """
+        min_size = self.piece_size["min"]
+        max_size = self.piece_size["max"]
+        max_pieces = self.piece_size["max_pieces"]
+
+        piece_size = 2 ** math.ceil(math.log2(max(size, 1) / max_pieces)) if size > max_pieces else 1
+        return int(min(max(piece_size, min_size), max_size))
+
     def filter_type(self, file_name: str) -> int:
 
         file_name = ManageTitles.clean(file_name)
@@ -4,7 +4,8 @@ import re
 import unicodedata
 
 from datetime import datetime
-from thefuzz import fuzz
+from functools import lru_cache
+from rapidfuzz import fuzz, process
 
 from common.external_services.igdb.core.tags import additions
 
@@ -221,14 +222,52 @@ class ManageTitles:
         }
         return type_.get(ext, None)
 
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def normalize_query(query: str) -> str:
+        """
+        Lower case without accents. The form of the searched title
+        """
+        return ManageTitles.remove_accent(query.lower())
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def normalize_title(title: str) -> str:
+        """
+        Lower case without hyphens, punctuation and accents. The form of the candidate titles
+        """
+        title = ManageTitles.clean(title.lower().replace("-", ""))
+        return ManageTitles.remove_accent(title.lower())
+
     @staticmethod
     def fuzzyit(str1: str, str2: str) -> int:
         """
         Returns similarity score between two strings
         """
-        str2 = str2.lower().replace("-", "")
-        str2 = ManageTitles.clean(str2)
-        return fuzz.ratio(ManageTitles.remove_accent(str1.lower()), ManageTitles.remove_accent(str2.lower()))
+        return round(fuzz.ratio(ManageTitles.normalize_query(str1), ManageTitles.normalize_title(str2)))
+
+    @staticmethod
+    def fuzzy_scores(query: str, titles: list[str]) -> list[int]:
+        """
+        Score a query against all the titles in a single call
+
+        Returns:
+            the fuzzyit score of each title in the same order
+        """
+        scores = [0] * len(titles)
+        choices = [ManageTitles.normalize_title(title) for title in titles]
+        for _, score, index in process.extract(ManageTitles.normalize_query(query), choices,
+                                               scorer=fuzz.ratio, limit=None):
+            scores[index] = round(score)
+        return scores
+
+    @staticmethod
+    def fuzzy_match(query: str, titles: list[str], threshold: int = 95) -> int | None:
+        """
+        Index of the first title with a score above the threshold or None
+        """
+        return next((index for index, score in enumerate(ManageTitles.fuzzy_scores(query, titles))
+                     if score > threshold), None)
 
     @staticmethod
     def normalize_filename(filename) -> str:
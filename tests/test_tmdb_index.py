@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import gzip
+import os
+import shutil
+
+import pytest
+
+from common.external_services.theMovieDB.core.exports import TmdbIndex
+
+# Lines recorded from the TMDB daily id exports
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def gzipped(source: str, target: str) -> str:
+    """ The export as it is downloaded from TMDB """
+    with open(source, "rb") as plain, gzip.open(target, "wb") as compressed:
+        shutil.copyfileobj(plain, compressed)
+    return target
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = TmdbIndex(db_file=str(tmp_path / "tmdb_index.db"))
+    index.load(gzipped(os.path.join(FIXTURES, "movie_ids.jsonl"), str(tmp_path / "movie_ids.json.gz")))
+    index.load(os.path.join(FIXTURES, "tv_series_ids.jsonl"))
+    return index
+
+
+def test_load_counts_the_valid_lines(tmp_path):
+    index = TmdbIndex(db_file=str(tmp_path / "tmdb_index.db"))
+    export = gzipped(os.path.join(FIXTURES, "movie_ids.jsonl"), str(tmp_path / "movie_ids.json.gz"))
+    assert index.load(export) == {"movie": 6}
+    assert index.load(os.path.join(FIXTURES, "tv_series_ids.jsonl")) == {"tv": 4}
+
+
+def test_candidates_most_popular_first(index):
+    assert [video_id for video_id, _, _ in index.candidates("the matrix", category="movie")] == [603, 604, 605]
+
+
+def test_candidates_by_category(index):
+    assert index.candidates("game of thrones", category="tv") == [(1399, "Game of Thrones", 369.594)]
+    assert index.candidates("game of thrones", category="movie") == []
+
+
+def test_candidates_every_word(index):
+    assert [title for _, title, _ in index.candidates("matrix reloaded", category="movie")] == ["The Matrix Reloaded"]
+    assert index.candidates("matrix dragon", category="movie") == []
+
+
+def test_candidates_unicode_title(index):
+    assert [video_id for video_id, _, _ in index.candidates("千と千尋の神隠し", category="movie")] == [129]
+
+
+def test_reload_replaces_the_category(index, tmp_path):
+    export = tmp_path / "movie_ids.jsonl"
+    export.write_text('{"id":603,"original_title":"The Matrix","popularity":70.0}\n', encoding="utf-8")
+    assert index.load(str(export)) == {"movie": 1}
+    assert index.candidates("avatar", category="movie") == []
+    assert [video_id for video_id, _, _ in index.candidates("breaking bad", category="tv")] == [1396]
+
+
+def test_candidates_without_index(tmp_path):
+    index = TmdbIndex(db_file=str(tmp_path / "missing.db"))
+    assert index.candidates("the matrix", category="movie") == []
+    assert not os.path.exists(tmp_path / "missing.db")
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from common.database import Database
+from unit3dup import config_settings
+from unit3dup.torrent import Torrent
+
+
+@pytest.fixture
+def mirror(tmp_path, monkeypatch):
+    """ A local mirror with two torrents, saved like the tracker answers: imdb id without 'tt' and zeros """
+    monkeypatch.setattr(config_settings.user_preferences, "CACHE_PATH", str(tmp_path))
+    database = Database(db_file="TEST")
+    database.write_many([
+        {"info_hash": "a" * 40, "name": "The Shawshank Redemption 1994 1080p", "imdb_id": "111161",
+         "tmdb_id": 278, "description": "Remux from the 4K master", "media_info": "Format : HEVC",
+         "created_at": "2024-01-01 10:00:00"},
+        {"info_hash": "b" * 40, "name": "The Godfather 1972 1080p", "imdb_id": "68646",
+         "tmdb_id": 238, "description": "Encode from the restored master", "media_info": "Format : AVC",
+         "created_at": "2024-01-02 10:00:00"},
+    ])
+    database.set_state("last_created_at", "2024-01-02 10:00:00")
+    yield database
+    database.database.close()
+
+
+@pytest.fixture
+def torrent(mirror):
+    """ A Torrent that answers from the local mirror, without the tracker """
+    torrent = Torrent.__new__(Torrent)
+    torrent.perPage = 100
+    torrent.tracker = None
+    torrent.database = mirror
+    torrent.local = True
+    return torrent
+
+
+@pytest.mark.parametrize("imdb_id", ["tt0111161", "TT0111161", "0111161", "111161", 111161])
+def test_get_by_imdb_id_local(torrent, imdb_id):
+    data = torrent.get_by_imdb_id(imdb_id=imdb_id)["data"]
+    assert [item["attributes"]["name"] for item in data] == ["The Shawshank Redemption 1994 1080p"]
+
+
+def test_get_by_imdb_id_local_unknown(torrent):
+    assert torrent.get_by_imdb_id(imdb_id="tt0000001")["data"] == []
+
+
+def test_query_imdb_id_local(mirror):
+    data = mirror.query(filters={"imdb_id": "tt0068646"})["data"]
+    assert [item["attributes"]["tmdb_id"] for item in data] == [238]
+
+
+def test_get_by_description_local(torrent):
+    data = torrent.get_by_description(description="restored master")["data"]
+    assert [item["attributes"]["tmdb_id"] for item in data] == [238]
+
+
+def test_get_by_mediainfo_local(torrent):
+    data = torrent.get_by_mediainfo(mediainfo="HEVC")["data"]
+    assert [item["attributes"]["tmdb_id"] for item in data] == [278]
+
+
+def test_get_by_description_local_without_fts(torrent):
+    torrent.database.fts = False
+    data = torrent.get_by_description(description="restored master")["data"]
+    assert [item["attributes"]["tmdb_id"] for item in data] == [238]
@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
 import json
+import os
 
 from common.torrent_clients import TransmissionClient, QbittorrentClient, RTorrentClient
 from common.command import CommandLine
+from common import title
+from common.external_services.theMovieDB.core.exports import TmdbIndex
 from common.settings import Load, DEFAULT_JSON_PATH, USER_TAGS_PATH, USER_SIGN_PATH, BAN_TAGS_PATH, version
 
 from unit3dup.torrent import View
+from unit3dup.sync import TrackerSync
+from unit3dup.pvtTorrent import Mytorrent
+from unit3dup.duplicate import CompareTitles
 from unit3dup import pvtTracker
 from unit3dup.bot import Bot
 
@@ -33,6 +39,27 @@ def main():
     # /// Initialize command line interface
     cli = CommandLine()
 
+    # Compare the speed of the hash engines
+    if cli.args.hashbench:
+        Mytorrent.benchmark(path=cli.args.hashbench)
+        return
+
+    # Compare the title matching pair by pair and in batch
+    if cli.args.fuzzbench:
+        CompareTitles.benchmark(path=cli.args.fuzzbench)
+        return
+
+    # Import a TMDB id export in the local index
+    if cli.args.tmdbimport:
+        if not os.path.isfile(cli.args.tmdbimport):
+            custom_console.bot_error_log(f"File not found '{cli.args.tmdbimport}'")
+            exit(1)
+        custom_console.bot_log(f"Importing '{cli.args.tmdbimport}'. Please wait..")
+        index = TmdbIndex(db_file=os.path.join(config.user_preferences.CACHE_PATH, "tmdb_index.db"))
+        for category, titles in index.load(export_file=cli.args.tmdbimport).items():
+            custom_console.bot_log(f"TMDB index '{category}' -> {titles} titles")
+        return
+
     # Get the torrent archive path
     if config.user_preferences.TORRENT_ARCHIVE_PATH:
         tracker_archive = config.user_preferences.TORRENT_ARCHIVE_PATH
@@ -157,12 +184,44 @@ def main():
         bot = Bot(path='', cli=cli.args, mode="folder", trackers_name_list=tracker_name_list)
         bot.ftp()
 
+    # Cache counters for profiling
+    if cli.args.stats:
+        guessit_stats = title.stats()
+        custom_console.bot_log(f"Guessit calls {guessit_stats['calls']} - memory hits {guessit_stats['memory_hits']}"
+                               f" - disk hits {guessit_stats['disk_hits']} - parsed {guessit_stats['misses']}")
+        for host, (requests_sent, connections) in pvtTracker.Myhttp.session_stats().items():
+            custom_console.bot_log(f"Tracker {host} requests {requests_sent} - connections {connections}"
+                                   f" - reused {requests_sent - connections}")
+
     # Commands list: commands not necessary for upload but may be useful
     if not cli.args.tracker:
         return
 
+    # Mirror the new torrents of the tracker in the local database
+    if cli.args.sync:
+        written = TrackerSync(tracker_name=cli.args.tracker).run()
+        custom_console.bot_log(f"Sync '{cli.args.tracker.upper()}' done -> {written} torrents saved")
+        return
+
     torrent_info = View(tracker_name=cli.args.tracker)
 
+    # Answer the search and the filters from the local mirror, all together
+    if cli.args.local:
+        if any([cli.args.season, cli.args.episode, cli.args.playlist_id, cli.args.collection_id, cli.args.stream,
+                cli.args.standard, cli.args.moderation]):
+            custom_console.bot_warning_log("Season, episode, playlist, collection, stream, SD and moderation"
+                                           " are not saved in the local mirror")
+        torrent_info.view_local(name=cli.args.search, uploader=cli.args.uploader, description=cli.args.description,
+                                media_info=cli.args.mediainfo, bd_info=cli.args.bdinfo, file_name=cli.args.filename,
+                                type_name=cli.args.type, res_name=cli.args.resolution,
+                                start_year=cli.args.startyear, end_year=cli.args.endyear,
+                                tmdb_id=cli.args.tmdb_id, imdb_id=cli.args.imdb_id, tvdb_id=cli.args.tvdb_id,
+                                mal_id=cli.args.mal_id, freeleech=cli.args.freelech, internal=cli.args.internal,
+                                alive=cli.args.alive, dead=cli.args.dead, dying=cli.args.dying,
+                                double_upload=cli.args.doubleup, featured=cli.args.featured,
+                                refundable=cli.args.refundable)
+        return
+
     ############################ Filter 'Combo' ##########################
     if cli.args.tmdb_id and cli.args.resolution:
         torrent_info.view_tmdb_res(cli.args.tmdb_id, cli.args.resolution)
@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
+import os
+import time
 import guessit
 import argparse
 import requests
 
+from thefuzz import fuzz
+
 from common.utility import ManageTitles, System
 from common.trackers.trackers import TRACKData
 from common.constants import my_language
@@ -19,16 +23,62 @@ from unit3dup.media import Media
 
 class CompareTitles:
 
-    def __init__(self, tracker_file: guessit, content_file: guessit):
+    def __init__(self, tracker_file: guessit, content_file: guessit, ratio: int | None = None):
         self.content_screen_size = 0
         self.tracker_screen_size = 0
         self.tracker_file = tracker_file
         self.content_file = content_file
         self.tracker_date = tracker_file.guessit_year
         self.content_date = content_file.guessit_year
+        # The ratio can be computed for all the tracker titles at once with ManageTitles.fuzzy_scores
         self.ratio = ManageTitles.fuzzyit(
             content_file.guessit_title, tracker_file.guessit_title
-        )
+        ) if ratio is None else ratio
+
+    @staticmethod
+    def benchmark(path: str) -> None:
+        """
+        Score a corpus of release names against itself one pair at a time and in batch.
+        Check that the scores are the same and print the pairs per second
+
+        Args:
+            path: a text file with one release name for each line or a folder of releases
+        """
+        if os.path.isdir(path):
+            corpus = [name for _, folders, files in os.walk(path) for name in folders + files]
+        else:
+            with open(path, encoding='utf-8') as corpus_file:
+                corpus = [line.strip() for line in corpus_file if line.strip()]
+        if not corpus:
+            custom_console.bot_error_log(f"No release names in '{path}'")
+            exit(1)
+
+        titles = [title.Guessit(name).guessit_title for name in corpus]
+        queries = titles[:100]
+        pairs = len(queries) * len(titles)
+
+        # The previous implementation: both strings normalized on every call
+        start = time.perf_counter()
+        single = []
+        for query in queries:
+            for candidate in titles:
+                candidate = ManageTitles.clean(candidate.lower().replace("-", ""))
+                single.append(fuzz.ratio(ManageTitles.remove_accent(query.lower()),
+                                         ManageTitles.remove_accent(candidate.lower())))
+        elapsed = time.perf_counter() - start
+        custom_console.bot_log(f"Pair by pair {pairs} pairs in {elapsed:.3f}s -> {pairs / elapsed:.0f} pairs/s")
+
+        ManageTitles.normalize_query.cache_clear()
+        ManageTitles.normalize_title.cache_clear()
+        start = time.perf_counter()
+        batch = [score for query in queries for score in ManageTitles.fuzzy_scores(query, titles)]
+        elapsed = time.perf_counter() - start
+        custom_console.bot_log(f"Batch        {pairs} pairs in {elapsed:.3f}s -> {pairs / elapsed:.0f} pairs/s")
+
+        if single == batch:
+            custom_console.bot_log("Same scores")
+        else:
+            custom_console.bot_error_log("The scores are different !")
 
     def same_season(self) -> bool:
 
@@ -138,9 +188,9 @@ class Duplicate:
 
          # Iterate through each torrent
          print()
-         for dead in torrents['data']:
+         for dead, (tracker_file, ratio) in zip(torrents['data'], self._compare_titles(torrents['data'])):
              # Test if it's a duplicate ( it's fine for reseeding)
-             if self._process_tracker_data(dead):
+             if self._process_tracker_data(dead, tracker_file=tracker_file, ratio=ratio):
                  if not config_settings.user_preferences.SKIP_DUPLICATE:
                      # (C) it's fine for seeding
                      if not self.user_choose():
@@ -157,9 +207,9 @@ class Duplicate:
 
     def search(self, torrent: requests) -> bool:
         # Compare and return a result
-        for t_data in torrent["data"]:
+        for t_data, (tracker_file, ratio) in zip(torrent["data"], self._compare_titles(torrent["data"])):
             # if a result is found, ask the user or autoskip
-            if self._process_tracker_data(t_data):
+            if self._process_tracker_data(t_data, tracker_file=tracker_file, ratio=ratio):
                 if not config_settings.user_preferences.SKIP_DUPLICATE:
                     return self.user_choose()
                 else:
@@ -171,21 +221,22 @@ class Duplicate:
     @staticmethod
     def user_choose() -> bool:
         try:
-            while True:
-                custom_console.bot_question_log(
-                    "\nPress (C) to continue, (S) to SKIP.. (Q) Quit - "
-                )
-                user_answer = input()
-                # Exit
-                if "q" == user_answer.lower():
-                    exit(1)
-
-                # Choice to continue
-                if "c" == user_answer.lower():
-                    return False
-                # Skip this media
-                if "s" == user_answer.lower():
-                    return True
+            with custom_console.input_lock:
+                while True:
+                    custom_console.bot_question_log(
+                        "\nPress (C) to continue, (S) to SKIP.. (Q) Quit - "
+                    )
+                    user_answer = input()
+                    # Exit
+                    if "q" == user_answer.lower():
+                        exit(1)
+
+                    # Choice to continue
+                    if "c" == user_answer.lower():
+                        return False
+                    # Skip this media
+                    if "s" == user_answer.lower():
+                        return True
         except KeyboardInterrupt:
             custom_console.bot_error_log("\nOperation cancelled. Bye !")
             exit(1)
@@ -258,10 +309,16 @@ class Duplicate:
 
         custom_console.bot_log(output)
 
-    def _process_tracker_data(self, data_from_the_tracker) -> bool:
+    def _compare_titles(self, tracker_data: list[dict]) -> list[tuple[title.Guessit, int]]:
+        """ Parse the tracker names and score all their titles against the user title in one call """
+        tracker_files = [title.Guessit(data['attributes']['name']) for data in tracker_data]
+        ratios = ManageTitles.fuzzy_scores(self.query.guessit_title,
+                                           [tracker_file.guessit_title for tracker_file in tracker_files])
+        return list(zip(tracker_files, ratios))
+
+    def _process_tracker_data(self, data_from_the_tracker, tracker_file: title.Guessit, ratio: int) -> bool:
 
-        if CompareTitles(tracker_file=title.Guessit(data_from_the_tracker['attributes']['name']),
-                         content_file=self.query).process():
+        if CompareTitles(tracker_file=tracker_file, content_file=self.query, ratio=ratio).process():
 
 
             delta_size = self._calculate_threshold(size=data_from_the_tracker['attributes']["size"])
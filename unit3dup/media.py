@@ -55,6 +55,9 @@ class Media:
         self._igdb_id: int | None = None
         self._generate_title: str | None = None
 
+        # // TMDB, TVDB, keywords and trailer resolved once for the whole show
+        self.metadata_group = None
+
     @property
     def title_sanitized(self) -> str:
         if not self._title_sanitized:
@@ -215,7 +218,7 @@ class Media:
     @property
     def guess_title(self) -> str:
         if not self._guess_title:
-            self._guess_title = title.Guessit(self.title_sanitized).guessit_title.strip()
+            self._guess_title = self.guess_filename.guessit_title.strip()
         return self._guess_title
 
     @guess_title.setter
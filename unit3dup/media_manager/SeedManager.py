@@ -3,10 +3,9 @@
 import argparse
 import os
 
-from common.external_services.theMovieDB.core.api import DbOnline
 from common.bittorrent import BittorrentData
 
-from unit3dup.media_manager.common import UserContent
+from unit3dup.media_manager.common import UserContent, MetadataGroup
 from unit3dup.media import Media
 
 class SeedManager:
@@ -29,9 +28,8 @@ class SeedManager:
                 # Build the path for downloading
                 os.makedirs(archive, exist_ok=True)
                 torrent_filepath = os.path.join(tracker_archive, selected_tracker, f"{content.torrent_name}.torrent")
-                # Search for tmdb ID
-                db_online = DbOnline(media=content, category=content.category, no_title=self.cli.notitle)
-                db = db_online.media_result
+                # Search for tmdb ID, unless it has been resolved for the whole show
+                db = MetadataGroup.media_result(content=content, no_title=self.cli.notitle)
 
                 torrents = UserContent.can_ressed(content=content, tracker_name=selected_tracker,cli=self.cli,
                                                   tmdb_id=db.video_id)
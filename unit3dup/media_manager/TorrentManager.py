@@ -13,7 +13,7 @@ from common.bittorrent import BittorrentData
 from common.constants import my_language
 from common.utility import System
 
-from unit3dup.media_manager.common import UserContent
+from unit3dup.media_manager.common import UserContent, MetadataGroup
 from view import custom_console
 
 
@@ -80,6 +80,9 @@ class TorrentManager:
         video_process_results: list[BittorrentData] = []
         docu_process_results: list[BittorrentData] = []
 
+        # The same metadata for every tracker and for every episode of a season
+        MetadataGroup.assign(self.videos[:self.fast_load], no_title=self.cli.notitle)
+
         for selected_tracker in trackers_name_list:
             # Build the torrent file and upload each GAME to the tracker
             if self.games:
@@ -135,6 +138,8 @@ class TorrentManager:
 
         """
 
+        MetadataGroup.assign(self.videos, no_title=self.cli.notitle)
+
         for selected_tracker in trackers_name_list:
             # From the contents
             if self.videos:
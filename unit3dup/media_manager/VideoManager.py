@@ -1,21 +1,34 @@
 # -*- coding: utf-8 -*-
 from argparse import Namespace
+from dataclasses import dataclass
 import os
 
-from common.external_services.theMovieDB.core.api import DbOnline
+from common.external_services.mediaresult import MediaResult
 from common.bittorrent import BittorrentData
 from common.tags import SearchTags
 from common import title
 
-from unit3dup.media_manager.common import UserContent
+from unit3dup.media_manager.pipeline import Pipeline, Stage
+from unit3dup.media_manager.common import UserContent, MetadataGroup
 from unit3dup.upload import UploadBot
 from unit3dup import config_settings
 from unit3dup.pvtVideo import Video
+from unit3dup.pvtTorrent import Mytorrent
 from unit3dup.media import Media
 
 from view import custom_console
 
 
+@dataclass
+class VideoJob:
+    """ The state of a content while it moves through the pipeline """
+    content: Media
+    torrent_filepath: str
+    torrent_response: Mytorrent | None
+    db: MediaResult | None = None
+    video_info: Video | None = None
+
+
 class VideoManager:
 
     def __init__(self, contents: list[Media], cli: Namespace, tags_list: dict, sign_list: dict, ban_list: dict):
@@ -38,6 +51,9 @@ class VideoManager:
         """
            Process the video contents to filter duplicates and create torrents
 
+           The contents go through a pipeline of stages (hash, duplicate, metadata, screenshots,
+           image hosts, tracker) so that different contents can be in different stages at the same time
+
            Returns:
                list: List of Bittorrent objects created for each content
         """
@@ -46,94 +62,119 @@ class VideoManager:
         if self.cli.mt:
             tracker_name_list = [selected_tracker.upper()]
 
-        #  Init the torrent list
-        bittorrent_list = []
-        for content in self.contents:
-            # /// User request to build the title; overwriting display_name
-            if self.cli.buildtags:
-                guess_filename = title.Guessit(content.title_sanitize_tags)
-                guess = guess_filename.guessit
-                tags_position = config_settings.user_preferences.TAGS_POSITION_SERIE if content.category=='tv'\
-                    else config_settings.user_preferences.TAGS_POSITION_MOVIE
-                search_tags = SearchTags(filename=content.title,
-                                         title=guess.get("title", None),
-                                         year=guess.get("year", ""),
-                                         season=content.guess_season,
-                                         episode=content.guess_episode,
-                                         releaser_sign=config_settings.user_preferences.RELEASER_SIGN,
-                                         tags_position=tags_position,
-                                         tags_list=self.tags_list,
-                                         sign_list=self.sign_list,
-                                         ban_list=self.ban_list,
-                                         media=content,
-                                         )
-                content.display_name = search_tags.process()
-
-            # get the archive path
-            archive = os.path.join(tracker_archive, selected_tracker)
-            os.makedirs(archive, exist_ok=True)
-            torrent_filepath = os.path.join(tracker_archive, selected_tracker, f"{content.torrent_name}.torrent")
-
-            # Filter contents based on existing torrents or duplicates
-            if UserContent.is_preferred_language(content=content):
-
-                if self.cli.watcher:
-                    if os.path.exists(torrent_filepath):
-                        custom_console.bot_log(f"Watcher Active.. skip the old upload '{content.file_name}'")
-                        continue
-
-                torrent_response = UserContent.torrent(content=content, tracker_name_list=tracker_name_list,
-                                                       selected_tracker=selected_tracker, this_path=torrent_filepath)
-
-                # Skip(S) if it is a duplicate or let the user choose to continue (C)
-                if (self.cli.duplicate or config_settings.user_preferences.DUPLICATE_ON
-                        and UserContent.is_duplicate(content=content, tracker_name=selected_tracker,
-                                                     cli=self.cli)):
-                    continue
-
-                # Search for VIDEO ID
-                db_online = DbOnline(media=content, category=content.category, no_title=self.cli.notitle)
-                db = db_online.media_result
-
-                # If it is 'None' we skipped the imdb search (-notitle)
-                if not db:
-                    continue
-
-                # Get meta from the media video
-                video_info = Video(media=content, tmdb_id=db.video_id, trailer_key=db.trailer_key)
-                video_info.build_info()
-
-                # print the title will be shown on the torrent page
-                custom_console.bot_log(f"'DISPLAYNAME'...{{{content.display_name}}}\n")
-
-                # Tracker instance
-                unit3d_up = UploadBot(content=content, tracker_name=selected_tracker, cli=self.cli)
-
-                # Get the data
-                processed_data = unit3d_up.data(show_id=db.video_id, imdb_id=db.imdb_id, tvdb_id=db.tvdb_id,
-                               show_keywords_list=db.keywords_list, video_info=video_info)
-
-                # Do not upload if an error occurs
-                if not processed_data:
-                    continue
-
-                # Don't upload if -noup is set to True
-                if self.cli.noup:
-                    custom_console.bot_warning_log(f"No Upload active. Done.")
-                    continue
-
-                # Send to the tracker
-                tracker_response, tracker_message = unit3d_up.send(torrent_archive=torrent_filepath)
-
-                # Store response for the torrent clients
-                bittorrent_list.append(
-                    BittorrentData(
-                        tracker_response=tracker_response,
-                        torrent_response=torrent_response,
-                        content=content,
-                        tracker_message=tracker_message,
-                        archive_path=torrent_filepath,
-                    ))
-
-        # // end content
-        return bittorrent_list
+        self.selected_tracker = selected_tracker
+        self.tracker_name_list = tracker_name_list
+
+        # get the archive path
+        self.archive = os.path.join(tracker_archive, selected_tracker)
+        os.makedirs(self.archive, exist_ok=True)
+
+        preferences = config_settings.user_preferences
+        pipeline = Pipeline(stages=[
+            Stage("hash", self._hash_stage, preferences.PIPELINE_HASH_WORKERS),
+            # A single worker, the user may be asked to choose
+            Stage("duplicate", self._duplicate_stage, 1),
+            Stage("metadata", self._metadata_stage, preferences.PIPELINE_METADATA_WORKERS),
+            Stage("screenshots", self._screenshots_stage, preferences.PIPELINE_SCREENSHOT_WORKERS),
+            Stage("imagehost", self._imagehost_stage, preferences.PIPELINE_IMAGEHOST_WORKERS),
+            Stage("upload", self._upload_stage, preferences.PIPELINE_UPLOAD_WORKERS),
+        ], queue_size=preferences.PIPELINE_QUEUE_SIZE)
+
+        return pipeline.run(items=self.contents)
+
+    def _hash_stage(self, content: Media) -> VideoJob | None:
+        """ Build the display name and create the torrent file """
+
+        # /// User request to build the title; overwriting display_name
+        if self.cli.buildtags:
+            guess_filename = title.Guessit(content.title_sanitize_tags)
+            guess = guess_filename.guessit
+            tags_position = config_settings.user_preferences.TAGS_POSITION_SERIE if content.category=='tv'\
+                else config_settings.user_preferences.TAGS_POSITION_MOVIE
+            search_tags = SearchTags(filename=content.title,
+                                     title=guess.get("title", None),
+                                     year=guess.get("year", ""),
+                                     season=content.guess_season,
+                                     episode=content.guess_episode,
+                                     releaser_sign=config_settings.user_preferences.RELEASER_SIGN,
+                                     tags_position=tags_position,
+                                     tags_list=self.tags_list,
+                                     sign_list=self.sign_list,
+                                     ban_list=self.ban_list,
+                                     media=content,
+                                     )
+            content.display_name = search_tags.process()
+
+        torrent_filepath = os.path.join(self.archive, f"{content.torrent_name}.torrent")
+
+        # Filter contents based on existing torrents or duplicates
+        if not UserContent.is_preferred_language(content=content):
+            return None
+
+        if self.cli.watcher:
+            if os.path.exists(torrent_filepath):
+                custom_console.bot_log(f"Watcher Active.. skip the old upload '{content.file_name}'")
+                return None
+
+        torrent_response = UserContent.torrent(content=content, tracker_name_list=self.tracker_name_list,
+                                               selected_tracker=self.selected_tracker, this_path=torrent_filepath)
+        return VideoJob(content=content, torrent_filepath=torrent_filepath, torrent_response=torrent_response)
+
+    def _duplicate_stage(self, job: VideoJob) -> VideoJob | None:
+        """ Skip(S) if it is a duplicate or let the user choose to continue (C) """
+        if ((self.cli.duplicate or config_settings.user_preferences.DUPLICATE_ON)
+                and UserContent.is_duplicate(content=job.content, tracker_name=self.selected_tracker, cli=self.cli)):
+            return None
+        return job
+
+    def _metadata_stage(self, job: VideoJob) -> VideoJob | None:
+        """ Search for VIDEO ID, unless it has been resolved for the whole show """
+        job.db = MetadataGroup.media_result(content=job.content, no_title=self.cli.notitle)
+
+        # If it is 'None' we skipped the imdb search (-notitle)
+        return job if job.db else None
+
+    def _screenshots_stage(self, job: VideoJob) -> VideoJob:
+        """ Get meta and frames from the media video """
+        job.video_info = Video(media=job.content, tmdb_id=job.db.video_id, trailer_key=job.db.trailer_key)
+        job.video_info.extract()
+        return job
+
+    def _imagehost_stage(self, job: VideoJob) -> VideoJob:
+        """ Upload the frames and build the description """
+        job.video_info.upload()
+        return job
+
+    def _upload_stage(self, job: VideoJob) -> BittorrentData | None:
+        """ Send the torrent and the description to the tracker """
+
+        # print the title will be shown on the torrent page
+        custom_console.bot_log(f"'DISPLAYNAME'...{{{job.content.display_name}}}\n")
+
+        # Tracker instance
+        unit3d_up = UploadBot(content=job.content, tracker_name=self.selected_tracker, cli=self.cli)
+
+        # Get the data
+        processed_data = unit3d_up.data(show_id=job.db.video_id, imdb_id=job.db.imdb_id, tvdb_id=job.db.tvdb_id,
+                                        show_keywords_list=job.db.keywords_list, video_info=job.video_info)
+
+        # Do not upload if an error occurs
+        if not processed_data:
+            return None
+
+        # Don't upload if -noup is set to True
+        if self.cli.noup:
+            custom_console.bot_warning_log(f"No Upload active. Done.")
+            return None
+
+        # Send to the tracker
+        tracker_response, tracker_message = unit3d_up.send(torrent_archive=job.torrent_filepath)
+
+        # Store response for the torrent clients
+        return BittorrentData(
+                tracker_response=tracker_response,
+                torrent_response=job.torrent_response,
+                content=job.content,
+                tracker_message=tracker_message,
+                archive_path=job.torrent_filepath,
+            )
@@ -3,21 +3,64 @@ import os
 import bencode2
 import argparse
 import requests
+import threading
 
 from concurrent.futures import ThreadPoolExecutor
 
 from common.torrent_clients import TransmissionClient, QbittorrentClient, RTorrentClient
 from common.trackers.data import trackers_api_data
 from common.bittorrent import BittorrentData
+from common.external_services.theMovieDB.core.api import DbOnline
+from common.external_services.mediaresult import MediaResult
 from common.utility import ManageTitles
 from common import config_settings
 from unit3dup.pvtTorrent import Mytorrent
+from unit3dup.pvtTracker import Myhttp
 from unit3dup.duplicate import Duplicate
 from unit3dup.media import Media
 
 from view import custom_console
 
 
+class MetadataGroup:
+    """
+    TMDB, TVDB, keywords and trailer searched once for each show and season
+
+    The search starts when the first episode of the group needs it, after the watcher, language and
+    duplicate filters. The other episodes wait for it and get the same MediaResult
+    """
+
+    def __init__(self, no_title: str):
+        self.no_title = no_title
+        self.lock = threading.Lock()
+        self.resolved = False
+        self.result: MediaResult | None = None
+
+    @classmethod
+    def assign(cls, videos: list[Media], no_title: str) -> None:
+        """ Group the episodes by title, season, category, year and tmdb id """
+        groups: dict[tuple, MetadataGroup] = {}
+        for content in videos:
+            key = (content.guess_title.lower(), content.guess_season, content.category,
+                   content.guess_filename.guessit_year, content.tmdb_id)
+            content.metadata_group = groups.setdefault(key, cls(no_title=no_title))
+
+    @staticmethod
+    def media_result(content: Media, no_title: str) -> MediaResult | None:
+        """ The result of the group of the content, or a search for the content alone """
+        if content.metadata_group:
+            return content.metadata_group.resolve(content)
+        return DbOnline(media=content, category=content.category, no_title=no_title).media_result
+
+    def resolve(self, content: Media) -> MediaResult | None:
+        # One search at a time for each group; the other groups are searched by the other workers
+        with self.lock:
+            if not self.resolved:
+                self.result = DbOnline(media=content, category=content.category, no_title=self.no_title).media_result
+                self.resolved = True
+            return self.result
+
+
 class UserContent:
     """
     Manage user media Files
@@ -128,7 +171,8 @@ class UserContent:
             # False if we need Update the torrent file
             if different:
                 my_torrent = Mytorrent(contents=content, meta=content.metainfo, trackers_list=tracker_name_list)
-                my_torrent.hash()
+                # Only the announces change: take the pieces from the old torrent file
+                my_torrent.hash(previous_torrent=this_path)
                 return my_torrent if my_torrent.write(overwrite=True, full_path=this_path) else None
         else:
             # Crea a new torrent file
@@ -255,7 +299,7 @@ class UserContent:
 
     @staticmethod
     def download_file(url: str, destination_path: str) -> bool:
-        download = requests.get(url)
+        download = Myhttp.pooled_session(url).get(url)
         if download.status_code == 200:
             # File archived
             with open(destination_path, "wb") as file:
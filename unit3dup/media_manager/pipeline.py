@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+import queue
+import threading
+
+from typing import Any, Callable
+
+
+class Stage:
+    """
+    One step of the pipeline: a function applied to each item by a pool of threads
+
+    The function returns the item for the next stage or None to drop it
+    """
+
+    def __init__(self, name: str, worker: Callable[[Any], Any], workers: int = 1):
+        self.name = name
+        self.worker = worker
+        self.workers = max(1, workers)
+
+
+class Pipeline:
+    """
+    Run a list of items through a chain of stages connected by bounded queues
+
+    Each stage has its own threads, so while an item waits for an HTTP response the next one
+    is already being hashed. The first exception raised by a stage (exit() included) stops the pipeline
+    and it is raised again in the caller thread
+    """
+
+    _STOP = object()
+
+    def __init__(self, stages: list[Stage], queue_size: int = 2):
+        self.stages = stages
+        # The last queue collects the results and it is never full
+        self.queues: list[queue.Queue] = [queue.Queue(maxsize=max(1, queue_size)) for _ in stages]
+        self.queues.append(queue.Queue())
+
+        self.abort = threading.Event()
+        self.error: BaseException | None = None
+        self._lock = threading.Lock()
+        self._running = [stage.workers for stage in stages]
+
+    def _put(self, index: int, item) -> None:
+        """ Put an item in a queue without blocking forever if the pipeline has been aborted """
+        while True:
+            try:
+                self.queues[index].put(item, timeout=0.2)
+                return
+            except queue.Full:
+                if self.abort.is_set() and item is not self._STOP:
+                    return
+
+    def _worker(self, index: int, stage: Stage) -> None:
+        in_queue = self.queues[index]
+        while True:
+            item = in_queue.get()
+            if item is self._STOP:
+                # Wake up the other workers of this stage
+                in_queue.put(self._STOP)
+                break
+
+            # Keep draining the queue so no one stays blocked on it
+            if self.abort.is_set():
+                continue
+
+            position, payload = item
+            try:
+                result = stage.worker(payload)
+            except BaseException as e:
+                with self._lock:
+                    if self.error is None:
+                        self.error = e
+                self.abort.set()
+                continue
+
+            if result is not None:
+                self._put(index + 1, (position, result))
+
+        # The last worker of the stage tells the next one that there is nothing more to do
+        with self._lock:
+            self._running[index] -= 1
+            last = self._running[index] == 0
+        if last:
+            self._put(index + 1, self._STOP)
+
+    def run(self, items: list) -> list:
+        """
+        Process the items and return the results in the same order as the input list
+
+        Args:
+            items: the objects to send to the first stage
+
+        Returns:
+            the items that reached the end of the pipeline
+        """
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(target=self._worker, args=(index, stage),
+                                          name=f"{stage.name}-{n}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for position, item in enumerate(items):
+                if self.abort.is_set():
+                    break
+                self._put(0, (position, item))
+            self._put(0, self._STOP)
+
+            # Short joins so Ctrl-C still reaches the main thread
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.2)
+        except KeyboardInterrupt:
+            self.abort.set()
+            raise
+
+        if self.error is not None:
+            raise self.error
+
+        results = []
+        while True:
+            item = self.queues[-1].get()
+            if item is self._STOP:
+                break
+            results.append(item)
+        return [payload for _, payload in sorted(results, key=lambda result: result[0])]
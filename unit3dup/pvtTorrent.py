@@ -1,11 +1,18 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
 import json
+import math
 import os
+import time
+import diskcache
 import torf
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
 from tqdm import tqdm
 
 from common.trackers.data import trackers_api_data
+from common.trackers.trackers import TRACKData
 from unit3dup.media import Media
 from unit3dup import config_settings
 
@@ -17,8 +24,167 @@ class HashProgressBar(tqdm):
         self.total = 100
         self.update(int(progress_percentage) - self.n)
 
+
+def hash_pieces(pieces: list[list[tuple[str, int, int]]], piece_size: int) -> bytes:
+    """
+    Worker: SHA1 of a run of consecutive pieces
+
+    Each piece is a list of (file path, offset, length) because a piece can cross the file boundaries
+
+    Returns:
+        the digests of the pieces joined together
+    """
+    buffer = bytearray(piece_size)
+    view = memoryview(buffer)
+    digests = []
+    handles = {}
+    try:
+        for piece in pieces:
+            filled = 0
+            for file_path, offset, length in piece:
+                if file_path not in handles:
+                    handles[file_path] = open(file_path, 'rb', buffering=0)
+                file = handles[file_path]
+                file.seek(offset)
+                end = filled + length
+                while filled < end:
+                    read = file.readinto(view[filled:end])
+                    if not read:
+                        raise OSError(f"Unexpected end of file '{file_path}'")
+                    filled += read
+            digests.append(hashlib.sha1(view[:filled]).digest())
+    finally:
+        for file in handles.values():
+            file.close()
+    return b"".join(digests)
+
+
+class HashEngine:
+    """
+    Compute the pieces of a torf.Torrent
+
+    The engines are selected by name with HASH_ENGINE in the config file
+    """
+
+    name = ''
+
+    def __init__(self, workers: int = 0):
+        # 0 = one worker for each core
+        self.workers = workers if workers > 0 else (os.cpu_count() or 4)
+
+    def pieces(self, mytorr: torf.Torrent, callback: Callable | None = None) -> bytes:
+        raise NotImplementedError
+
+    @staticmethod
+    def select(name: str | None = None, workers: int | None = None) -> 'HashEngine':
+        name = (name or config_settings.user_preferences.HASH_ENGINE).lower()
+        workers = config_settings.user_preferences.HASH_WORKERS if workers is None else workers
+        for engine in HashEngine.__subclasses__():
+            if engine.name == name:
+                return engine(workers=workers)
+        custom_console.bot_error_log(f"Unknown hash engine '{name}'. Please update your configuration file")
+        exit(1)
+
+
+class TorfEngine(HashEngine):
+    """ torf threads """
+
+    name = 'torf'
+
+    def pieces(self, mytorr: torf.Torrent, callback: Callable | None = None) -> bytes:
+        mytorr.generate(threads=self.workers, callback=callback, interval=0)
+        return mytorr.metainfo['info']['pieces']
+
+
+class ProcessEngine(HashEngine):
+    """ A pool of processes. Each task reads a run of pieces with large readinto() calls """
+
+    name = 'process'
+
+    # Bytes read by a single task
+    task_size = 64 * 1024 ** 2
+
+    @staticmethod
+    def layout(mytorr: torf.Torrent) -> list[list[tuple[str, int, int]]]:
+        """ Split the file stream into pieces of (file path, offset, length) """
+        piece_size = mytorr.piece_size
+        pieces = []
+        piece = []
+        piece_filled = 0
+        for file_path, file in zip(mytorr.filepaths, mytorr.files):
+            offset = 0
+            while offset < file.size:
+                length = min(piece_size - piece_filled, file.size - offset)
+                piece.append((str(file_path), offset, length))
+                offset += length
+                piece_filled += length
+                if piece_filled == piece_size:
+                    pieces.append(piece)
+                    piece = []
+                    piece_filled = 0
+        # The last piece can be smaller
+        if piece:
+            pieces.append(piece)
+        return pieces
+
+    def pieces(self, mytorr: torf.Torrent, callback: Callable | None = None) -> bytes:
+        layout = self.layout(mytorr)
+        pieces_per_task = max(1, self.task_size // mytorr.piece_size)
+        tasks = [layout[i:i + pieces_per_task] for i in range(0, len(layout), pieces_per_task)]
+
+        digests = []
+        hashed = 0
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            # map() returns the results in the same order of the tasks
+            for task, result in zip(tasks, executor.map(hash_pieces, tasks, [mytorr.piece_size] * len(tasks))):
+                digests.append(result)
+                hashed += len(task)
+                if callback:
+                    callback(mytorr, task[-1][-1][0], hashed, len(layout))
+
+        pieces = b"".join(digests)
+        mytorr.metainfo['info']['pieces'] = pieces
+        return pieces
+
+
+class PieceCache:
+    """
+    Persistent store of the piece hashes
+
+    The key is built from path, size and mtime of each file plus the piece size, so a torrent
+    for another tracker or a new attempt after a failed upload doesn't read the files again
+    """
+
+    def __init__(self) -> None:
+        self.cache = diskcache.Cache(str(os.path.join(config_settings.user_preferences.CACHE_PATH, "pieces.cache")),
+                                     size_limit=config_settings.user_preferences.CACHE_PIECES_SIZE * 1024 ** 2,
+                                     eviction_policy='least-recently-used')
+
+    @staticmethod
+    def key(mytorr: torf.Torrent) -> str:
+        """ Identity of the file set. A different size or mtime is a different key """
+        identity = [str(mytorr.piece_size)]
+        for file_path in mytorr.filepaths:
+            stat = os.stat(file_path)
+            identity.append(f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}")
+        return hashlib.sha1("\n".join(identity).encode()).hexdigest()
+
+    def get(self, mytorr: torf.Torrent) -> bytes | None:
+        pieces = self.cache.get(self.key(mytorr))
+        # Ignore a damaged entry
+        if pieces and len(pieces) == 20 * math.ceil(mytorr.size / mytorr.piece_size):
+            return pieces
+        return None
+
+    def set(self, mytorr: torf.Torrent) -> None:
+        self.cache[self.key(mytorr)] = mytorr.metainfo['info']['pieces']
+
+
 class Mytorrent:
 
+    # Pieces hashed during this run. The torrents for the other trackers differ only in source/announce
+    hashed_pieces: dict[str, bytes] = {}
+
     def __init__(self, contents: Media, meta: str, trackers_list = None):
 
         self.torrent_path = contents.torrent_path
@@ -37,22 +203,76 @@ class Mytorrent:
         self.mytorr.created_by = "https://github.com/31December99/Unit3Dup"
         self.mytorr.private = True
         self.mytorr.source= trackers_api_data[trackers_list[0]]['source']
-        self.mytorr.segments = 16 * 1024 * 1024
+        self.mytorr.piece_size = TRACKData.load_from_module(trackers_list[0]).select_piece_size(self.mytorr.size)
+
 
+    def hash(self, previous_torrent: str | None = None) -> None:
+        """
+        Hash the files or reuse the pieces already computed for the same files
 
-    def hash(self):
+        Args:
+            previous_torrent: an existing torrent file for the same content that can give its pieces
+        """
         # Calculate the torrent size
         size = round(self.mytorr.size / (1024 ** 3), 2)
         # Print a message for the user
         custom_console.print(f"\n{self.trackers_list} {self.mytorr.name} - {size} GB")
+
+        key = PieceCache.key(self.mytorr)
+
+        # Same files already hashed for another tracker
+        pieces = Mytorrent.hashed_pieces.get(key)
+        if not pieces and previous_torrent:
+            pieces = self.pieces_from_torrent(previous_torrent)
+
+        piece_cache = PieceCache() if config_settings.user_preferences.CACHE_PIECES else None
+        if not pieces and piece_cache:
+            pieces = piece_cache.get(self.mytorr)
+
+        if pieces:
+            self.restamp(pieces)
+            Mytorrent.hashed_pieces[key] = pieces
+            custom_console.bot_log("Reusing the pieces already hashed..")
+            return
+
         # Hashing
         with HashProgressBar() as progress:
             try:
-                self.mytorr.generate(threads=4, callback=progress.callback, interval=0)
-            except torf.TorfError as e:
-                custom_console.bot_error_log(e)
+                HashEngine.select().pieces(self.mytorr, callback=progress.callback)
+            except (torf.TorfError, OSError) as e:
+                custom_console.bot_error_log(str(e))
                 exit(1)
 
+        Mytorrent.hashed_pieces[key] = self.mytorr.metainfo['info']['pieces']
+        if piece_cache:
+            piece_cache.set(self.mytorr)
+
+    def restamp(self, pieces: bytes) -> None:
+        """ Build the info dict with the current source and announces on top of pieces hashed before """
+        self.mytorr.metainfo['info']['pieces'] = pieces
+
+    def pieces_from_torrent(self, torrent_path: str) -> bytes | None:
+        """
+        Read the pieces of an existing torrent file if it describes the same files
+
+        The torrent must have the same piece size, the same file list and it must be newer than the files
+        """
+        try:
+            previous = torf.Torrent.read(torrent_path)
+        except torf.TorfError:
+            return None
+
+        if previous.piece_size != self.mytorr.piece_size:
+            return None
+        files = [(str(file), file.size) for file in self.mytorr.files]
+        if [(str(file), file.size) for file in previous.files] != files:
+            return None
+
+        torrent_mtime = os.path.getmtime(torrent_path)
+        if any(os.path.getmtime(file_path) > torrent_mtime for file_path in self.mytorr.filepaths):
+            return None
+        return previous.metainfo['info']['pieces']
+
     def write(self, overwrite: bool, full_path: str) -> bool:
         try:
             if overwrite:
@@ -66,3 +286,26 @@ class Mytorrent:
         except FileNotFoundError as e:
             custom_console.bot_error_log(f"Trying to update torrent but it does not exist: {full_path}")
             return False
+
+    @staticmethod
+    def benchmark(path: str) -> None:
+        """
+        Hash the path with each engine, check that the pieces are the same and print the speed in GB/s
+        """
+        results = {}
+        for engine in HashEngine.__subclasses__():
+            mytorr = torf.Torrent(path=path, private=True)
+            start = time.perf_counter()
+            try:
+                results[engine.name] = engine(workers=config_settings.user_preferences.HASH_WORKERS).pieces(mytorr)
+            except (torf.TorfError, OSError) as e:
+                custom_console.bot_error_log(str(e))
+                exit(1)
+            elapsed = time.perf_counter() - start
+            custom_console.bot_log(f"Engine '{engine.name}' {round(mytorr.size / (1024 ** 3), 2)} GB in {elapsed:.2f}s "
+                                   f"-> {mytorr.size / (1024 ** 3) / elapsed:.2f} GB/s")
+
+        if len(set(results.values())) == 1:
+            custom_console.bot_log("All the engines produced the same pieces")
+        else:
+            custom_console.bot_error_log("The engines produced different pieces !")
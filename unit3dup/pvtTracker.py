@@ -1,14 +1,22 @@
 # -*- coding: utf-8 -*-
 import io
-import time
+import threading
 import requests
 
-from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+from urllib.parse import urljoin, urlparse
 from view import custom_console
 from common.trackers.data import trackers_api_data
+from common import config_settings
+from unit3dup.ratelimit import TokenBucket
 
 
 class Myhttp:
+
+    # One keep-alive session for each tracker host, shared by all the instances of the run
+    _sessions: dict[str, requests.Session] = {}
+    _sessions_lock = threading.Lock()
+
     def __init__(self, tracker_name: str, pass_key=''):
 
         api_data = trackers_api_data[tracker_name.upper()] if tracker_name else None
@@ -25,6 +33,8 @@ class Myhttp:
         self.filter_url = urljoin(self.base_url, "api/torrents/filter?")
         self.fetch_url = urljoin(self.base_url, "api/torrents/")
         self.tracker_announce_url = urljoin(self.base_url, f"announce/{pass_key}")
+        self.session = self.pooled_session(self.base_url)
+        self.bucket = TokenBucket.for_tracker(tracker_name)
 
         self.headers = {
             "User-Agent": "Unit3D-up/0.0 (Linux 5.10.0-23-amd64)",
@@ -60,6 +70,48 @@ class Myhttp:
         }
 
 
+    @classmethod
+    def pooled_session(cls, url: str) -> requests.Session:
+        """ Return the session of the url host. The connections are reused until the end of the run """
+        host = urlparse(url).netloc
+        with Myhttp._sessions_lock:
+            if host not in Myhttp._sessions:
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=max(1, config_settings.user_preferences.TRACKER_POOL_SIZE))
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                Myhttp._sessions[host] = session
+            return Myhttp._sessions[host]
+
+    @classmethod
+    def session_stats(cls) -> dict[str, tuple[int, int]]:
+        """ Requests sent and connections opened for each tracker host """
+        stats = {}
+        with Myhttp._sessions_lock:
+            for host, session in Myhttp._sessions.items():
+                adapter = session.get_adapter(f"https://{host}")
+                pools = [adapter.poolmanager.pools.get(key) for key in adapter.poolmanager.pools.keys()]
+                stats[host] = (sum(pool.num_requests for pool in pools if pool),
+                               sum(pool.num_connections for pool in pools if pool))
+        return stats
+
+    def _request(self, method: str, url: str, retries: int = 3, **kwargs) -> requests.Response:
+        """ Send a request when the rate limit allows it. Retry after a 429 """
+        while True:
+            # A retry sends the files again: requests has read the handles to the end
+            for field in (kwargs.get("files") or {}).values():
+                handle = field[1] if isinstance(field, tuple) else field
+                if hasattr(handle, "seek"):
+                    handle.seek(0)
+            self.bucket.acquire()
+            response = self.session.request(method, url=url, **kwargs)
+            self.bucket.update(response)
+            if response.status_code != 429 or retries == 0:
+                return response
+            retries -= 1
+            custom_console.bot_warning_log(f"TRACKER Rate limit. Retry..")
+
     def _post(self, files: str, data: dict, params: dict):
         pass
 
@@ -71,15 +123,15 @@ class Tracker(Myhttp):
     def _get(self, params: dict) -> requests.Response | None:
         while True:
             try:
-                response = requests.get(
-                    url=self.filter_url, headers=self.headers, params=params, timeout=10
+                response = self._request(
+                    "GET", url=self.filter_url, headers=self.headers, params=params, timeout=10
                 )
                 response.raise_for_status()
                 return response.json()
             except requests.exceptions.HTTPError as e:
                 if e.response.status_code == 429:
-                    custom_console.bot_error_log(f"TRACKER HTTP Error {e.response.status_code} Rate limit (wait for 60 secs)...")
-                    time.sleep(60)
+                    # The bucket waits for the time asked by the tracker
+                    custom_console.bot_error_log(f"TRACKER HTTP Error {e.response.status_code} Rate limit...")
                 else:
                     custom_console.bot_error_log(
                         f"TRACKER HTTP Error {e.response.status_code}. Check your configuration file"
@@ -103,7 +155,8 @@ class Tracker(Myhttp):
 
     def _post(self, file: dict, data: dict, params: dict):
             try:
-                return requests.post(
+                return self._request(
+                    "POST",
                     url=self.upload_url,
                     files=file,
                     data=data,
@@ -117,12 +170,13 @@ class Tracker(Myhttp):
 
 
     def _fetch_all(self, params: dict) -> requests.Response:
-        return requests.get(
-            url=self.fetch_url, headers=self.headers, params=params
+        return self._request(
+            "GET", url=self.fetch_url, headers=self.headers, params=params
         ).json()
 
     def _fetch_id(self, torrent_id: int) -> requests.Response:
-        return requests.get(
+        return self._request(
+            "GET",
             url=f"{self.fetch_url}{torrent_id}",
             headers=self.headers,
             params=self.params,
@@ -130,7 +184,7 @@ class Tracker(Myhttp):
 
     def _next_page(self, url: str) -> requests.Response:
         try:
-            response = requests.get(url=url, headers=self.headers, params=self.params)
+            response = self._request("GET", url=url, headers=self.headers, params=self.params)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.HTTPError as http_err:
@@ -298,6 +352,13 @@ class filterAPI(Tracker):
         self.params["perPage"] = perPage
         return self._get(params=self.params)
 
+    def latest(self, perPage: int = None) -> requests.Response:
+        # The newest torrents first
+        self.params["sortField"] = "created_at"
+        self.params["sortDirection"] = "desc"
+        self.params["perPage"] = perPage
+        return self._get(params=self.params)
+
     def next(self, url: str) -> requests.Response:
         return self._next_page(url=url)
 
@@ -441,6 +502,9 @@ class Unit3d(filterAPI, Torrents, Uploader):
         if res_id:
             return self.resolution(res_id=res_id, perPage=perPage)
 
+    def get_latest(self, perPage: int = None) -> requests.Response:
+        return self.latest(perPage=perPage)
+
     def fetch_all(self, perPage: int = None) -> requests.Response:
         return self.torrents(perPage=perPage)
 
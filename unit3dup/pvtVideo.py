@@ -4,7 +4,7 @@ import os.path
 
 import diskcache
 
-from common.external_services.imageHost import Build
+from common.external_services.imageHost import Build, ScreenshotCache
 from common.frames import VideoFrame
 
 from view import custom_console
@@ -41,6 +41,8 @@ class Video:
         self.is_hd: int = 0
         self.description: str = ''
         self.mediainfo: str = ''
+        self.extracted_frames: list[bytes] = []
+        self.frame_urls: list[str] | None = None
 
     @staticmethod
     def hash_key(key: str) -> str:
@@ -49,6 +51,11 @@ class Video:
 
     def build_info(self):
         """Build the information to send to the tracker"""
+        self.extract()
+        self.upload()
+
+    def extract(self):
+        """Read the mediainfo and extract the screenshots unless they are already cached"""
         # media_info
         self.mediainfo = self.media.mediafile.info
 
@@ -60,10 +67,20 @@ class Video:
                 self.is_hd = description.get('is_hd', 0)
 
         if not self.description:
+            # The same video with the same settings has already been uploaded
+            screenshot_cache = ScreenshotCache() if config_settings.user_preferences.CACHE_SCR else None
+            frames_key = ScreenshotCache.video_key(self.file_name, self.video_frames.num_screenshots,
+                                                   webp=config_settings.user_preferences.WEBP_ENABLED)
+            cached = screenshot_cache.video_urls(frames_key) if screenshot_cache else None
+            if cached:
+                self.frame_urls, self.is_hd = cached
+                custom_console.bot_warning_log(f"\n<> Reusing the screenshots already uploaded for '{self.file_name}'")
+                return
+
             # If no description found generate it
             custom_console.bot_log(f"\n[GENERATING IMAGES..] [HD {'ON' if self.is_hd == 0 else 'OFF'}]")
             # Extract the frames
-            extracted_frames, is_hd = self.video_frames.create()
+            extracted_frames, self.is_hd = self.video_frames.create()
             # Create a webp file if it's enabled in the config json
             extracted_frames_webp = []
             if config_settings.user_preferences.WEBP_ENABLED:
@@ -72,12 +89,20 @@ class Video:
                                                     duration=10,
                                                     output_path=
                                                     os.path.join(config_settings.user_preferences.CACHE_PATH,"file.webp"))
+            self.extracted_frames = (extracted_frames_webp or []) + extracted_frames
+            if screenshot_cache:
+                screenshot_cache.store_video_frames(frames_key, [ScreenshotCache.digest(frame)
+                                                                 for frame in self.extracted_frames], self.is_hd)
             custom_console.bot_log("Done.")
 
+    def upload(self):
+        """Upload the extracted screenshots and build the description"""
+        if not self.description:
             # Build the description
             # Header
             self.description+= config_settings.user_preferences.MY_TEXT_H
-            build_description = Build(extracted_frames=extracted_frames_webp+extracted_frames, filename= self.display_name)
+            build_description = Build(extracted_frames=self.extracted_frames, filename= self.display_name,
+                                      frame_urls=self.frame_urls)
             self.description+= build_description.description()
 
             if config_settings.user_preferences.MY_SIGN:
@@ -97,8 +122,9 @@ class Video:
             if self.trailer_key:
                 self.description += (f"[b][spoiler=Spoiler: PLAY TRAILER][center][youtube]{self.trailer_key}[/youtube]"
                                      f"[/center][/spoiler][/b]")
-            self.is_hd = is_hd
+            # Free the memory, the frames are no longer needed
+            self.extracted_frames = []
 
         # Caching
         if config_settings.user_preferences.CACHE_SCR:
-            self.cache[self.cache_key] = {'tmdb_id': self.tmdb_id, 'description': self.description, 'is_hd': self.is_hd}
\ No newline at end of file
+            self.cache[self.cache_key] = {'tmdb_id': self.tmdb_id, 'description': self.description, 'is_hd': self.is_hd}
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from common.trackers.trackers import TRACKData, DEFAULT_RATE_LIMIT
+
+
+class TokenBucket:
+    """
+    Token bucket shared by all the threads that call the same tracker
+
+    The bucket holds up to 'requests' tokens and it is refilled in 'per' seconds. The answers of the tracker
+    correct it: X-RateLimit-Remaining lowers the tokens, Retry-After and X-RateLimit-Reset stop the requests
+    until the tracker accepts them again
+    """
+
+    # One bucket for each tracker for the whole run
+    _buckets: dict[str, "TokenBucket"] = {}
+    _buckets_lock = threading.Lock()
+
+    def __init__(self, requests_limit: int = 30, per: float = 60):
+        self.capacity = max(1, requests_limit)
+        self.per = max(1.0, per)
+        self.fill_rate = self.capacity / self.per
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def for_tracker(cls, tracker_name: str) -> "TokenBucket":
+        """ The bucket of a tracker, configured with the RATE_LIMIT of its module """
+        name = tracker_name.upper()
+        with cls._buckets_lock:
+            if name not in cls._buckets:
+                try:
+                    rate_limit = TRACKData.load_from_module(tracker_name=name).rate_limit
+                except KeyError:
+                    rate_limit = DEFAULT_RATE_LIMIT
+                cls._buckets[name] = cls(requests_limit=rate_limit["requests"], per=rate_limit["per"])
+            return cls._buckets[name]
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+
+    def acquire(self) -> None:
+        """ Wait until a request can be sent """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+    def block(self, seconds: float) -> None:
+        """ No requests for the next seconds """
+        with self.lock:
+            self.tokens = 0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    @staticmethod
+    def retry_after(value: str) -> float | None:
+        """ Seconds from a Retry-After header: a number or an http date """
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def update(self, response: requests.Response) -> None:
+        """ Follow the limits reported by the tracker """
+        headers = response.headers
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is not None and remaining.isdigit():
+            with self.lock:
+                self.tokens = min(self.tokens, float(remaining))
+
+        wait = self.retry_after(headers["Retry-After"]) if "Retry-After" in headers else None
+        if wait is None and remaining == "0" and headers.get("X-RateLimit-Reset", "").isdigit():
+            wait = max(0.0, int(headers["X-RateLimit-Reset"]) - time.time())
+        if wait is None and response.status_code == 429:
+            # No hint from the tracker: wait for the next window
+            wait = self.per
+        if wait is not None:
+            self.block(wait)
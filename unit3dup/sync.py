@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from common.database import Database
+from unit3dup import pvtTracker
+from view import custom_console
+
+
+class TrackerSync:
+    """
+    Mirror the tracker catalog in the local database
+
+    The first run (-sync) reads every page of the filter endpoint. The next runs read the newest torrents
+    until they reach the last one already saved. The torrents are updated by their info_hash.
+    The next page is saved after each page, so an interrupted crawl goes on from where it stopped
+    """
+
+    # Trackers already checked in this run and whether their mirror can be used
+    _refreshed: dict[str, bool] = {}
+    _refresh_lock = threading.Lock()
+
+    def __init__(self, tracker_name: str):
+        self.tracker_name = tracker_name.upper()
+        self.tracker = pvtTracker.Unit3d(tracker_name=tracker_name)
+        self.database = Database(db_file=tracker_name)
+        self.perPage = 100
+
+    def run(self) -> int:
+        """
+        Save the new torrents
+
+        Returns:
+            the number of torrents written
+        """
+        last_created_at = self.database.get_state("last_created_at")
+        resume = self.database.get_state("crawl_next")
+        if resume:
+            custom_console.bot_log(f"Sync '{self.tracker_name}' resumes the interrupted run. Please wait..")
+        elif last_created_at:
+            custom_console.bot_log(f"Sync '{self.tracker_name}' from {last_created_at}")
+        else:
+            custom_console.bot_log(f"Sync '{self.tracker_name}' first run: the whole catalog. Please wait..")
+
+        # The newest torrent of the crawl becomes the new starting point only when the crawl is complete
+        newest = self.database.get_state("crawl_newest") or last_created_at or ''
+        written = 0
+        page = 0
+        tracker_data = self.tracker.next(url=resume) if resume else self.tracker.get_latest(perPage=self.perPage)
+        while tracker_data:
+            page += 1
+            items = [item['attributes'] for item in tracker_data.get("data", [])]
+            self.database.write_many(items)
+            newest = max([newest] + [attributes.get('created_at') or '' for attributes in items])
+            written += len(items)
+            custom_console.bot_log(f"Sync '{self.tracker_name}' page {page} -> {written} torrents")
+
+            # Stop at the first page with a torrent already saved
+            if last_created_at and any((attributes.get('created_at') or '') <= last_created_at
+                                       for attributes in items):
+                break
+
+            next_page = tracker_data.get("links", {}).get("next")
+            if not next_page:
+                break
+            self.database.set_state("crawl_next", next_page)
+            self.database.set_state("crawl_newest", newest)
+            tracker_data = self.tracker.next(url=next_page)
+
+        if newest:
+            self.database.set_state("last_created_at", newest)
+        self.database.clear_state("crawl_next", "crawl_newest")
+        return written
+
+    @classmethod
+    def refresh(cls, tracker_name: str) -> bool:
+        """
+        Bring a complete mirror up to date once per run
+
+        The whole catalog is read only by -sync: without a complete mirror the searches stay on-line
+
+        Returns:
+            True if the mirror can answer the searches
+        """
+        name = tracker_name.upper()
+        with cls._refresh_lock:
+            if name not in cls._refreshed:
+                sync = cls(tracker_name=tracker_name)
+                if sync.database.synced():
+                    sync.run()
+                    cls._refreshed[name] = True
+                else:
+                    custom_console.bot_warning_log(f"No local mirror for '{name}'. Run -sync to build it")
+                    cls._refreshed[name] = False
+            return cls._refreshed[name]
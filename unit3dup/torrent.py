@@ -1,11 +1,11 @@
 # -*- coding: utf-8 -*-
 import re
-import time
 import requests
 
 from common.trackers.trackers import TRACKData
 from common.database import Database
-from unit3dup import pvtTracker
+from unit3dup.sync import TrackerSync
+from unit3dup import pvtTracker, config_settings
 from view import custom_console
 
 
@@ -17,6 +17,11 @@ class Torrent:
         self.tracker = pvtTracker.Unit3d(tracker_name=tracker_name)
         self.database = Database(db_file=tracker_name)
 
+        # Answer the searches from the local mirror of the tracker catalog
+        self.local = False
+        if config_settings.user_preferences.TRACKER_MIRROR:
+            self.local = TrackerSync.refresh(tracker_name=tracker_name)
+
     def get_unique_id(self, media_info: str) -> str:
         # Divido per campi
         raw_media = media_info.split("\r")
@@ -30,9 +35,13 @@ class Torrent:
     def search(self, keyword: str) -> requests.Response:
         # The user does not always include the '-' (hyphen) in the title
         keyword = keyword.replace("-", " ")
+        if self.local:
+            return self.database.search_name(name=keyword)
         return self.tracker.get_name(name=keyword, perPage=self.perPage)
 
     def get_by_description(self, description: str) -> requests.Response:
+        if self.local:
+            return self.database.search_text(text=description, column="description")
         return self.tracker.get_description(
             description=description, perPage=self.perPage
         )
@@ -41,6 +50,8 @@ class Torrent:
         return self.tracker.get_bdinfo(bdinfo=bd_info, perPage=self.perPage)
 
     def get_by_uploader(self, username: str) -> requests.Response:
+        if self.local:
+            return self.database.search_by(column="uploader", value=username)
         return self.tracker.get_uploader(uploader=username, perPage=self.perPage)
 
     def get_by_start_year(self, start_year: str) -> requests.Response:
@@ -50,6 +61,8 @@ class Torrent:
         return self.tracker.end_year(end_year=end_year, perPage=self.perPage)
 
     def get_by_mediainfo(self, mediainfo: str) -> requests.Response:
+        if self.local:
+            return self.database.search_text(text=mediainfo, column="media_info")
         return self.tracker.get_mediainfo(mediainfo=mediainfo, perPage=self.perPage)
 
     def get_by_types(self, type_name: str) -> requests.Response:
@@ -66,18 +79,28 @@ class Torrent:
         return self.tracker.get_filename(file_name=file_name, perPage=self.perPage)
 
     def get_by_tmdb_id(self, tmdb_id: int) -> requests.Response:
+        if self.local:
+            return self.database.search_by(column="tmdb_id", value=tmdb_id)
         return self.tracker.get_tmdb(tmdb_id=tmdb_id, perPage=self.perPage)
 
     def get_by_imdb_id(self, imdb_id: int) -> requests.Response:
+        if self.local:
+            return self.database.search_by(column="imdb_id", value=imdb_id)
         return self.tracker.get_imdb(imdb_id=imdb_id, perPage=self.perPage)
 
     def get_by_igdb_id(self, imdb_id: int) -> requests.Response:
+        if self.local:
+            return self.database.search_by(column="igdb_id", value=imdb_id)
         return self.tracker.get_igdb(igdb_id=imdb_id, perPage=self.perPage)
 
     def get_by_tvdb_id(self, tvdb_id: int) -> requests.Response:
+        if self.local:
+            return self.database.search_by(column="tvdb_id", value=tvdb_id)
         return self.tracker.get_tvdb(tvdb_id=tvdb_id, perPage=self.perPage)
 
     def get_by_mal_id(self, mal_id: int) -> requests.Response:
+        if self.local:
+            return self.database.search_by(column="mal_id", value=mal_id)
         return self.tracker.get_mal(mal_id=mal_id, perPage=self.perPage)
 
     def get_by_playlist_id(self, playlist_id: int) -> requests.Response:
@@ -191,9 +214,10 @@ class View(Torrent):
 
             # Print a data to the console
             custom_console.bot_log(f"\n {media} - {item['attributes']['name']}")
-            # Save torrent data into database by -db flag
-            if save:
-                self.database.write(item['attributes'])
+
+        # Save torrent data into database by -db flag, a transaction for each page
+        if save:
+            self.database.write_many([item['attributes'] for item in data])
 
     def page_view(self, tracker_data: dict, tracker: pvtTracker.Tracker, info=False, inkey=True, save=False):
 
@@ -211,9 +235,7 @@ class View(Torrent):
                 )
                 if input().lower() == "q":
                     break
-            else:
-                # otherwise wait for 2 seconds ( 30 request/ 60sec max) dirty
-                time.sleep(2)
+            # The requests are throttled by the tracker rate limit
             print()
             custom_console.rule(f"\n[bold blue]'Page -> {page}'", style="#ea00d9")
             tracker_data = tracker.next(url=tracker_data["links"]["next"])
@@ -452,6 +474,31 @@ class View(Torrent):
         if tracker_data:
             self.page_view(tracker_data=tracker_data, tracker=self.tracker)
 
+    def view_local(self, type_name: str = None, res_name: str = None, **filters):
+        """ Search the local mirror with all the filters together. No requests to the tracker """
+        if not self.database.synced():
+            custom_console.bot_error_log(f"No local mirror for '{self.tracker_name}'. Please run -sync first")
+            exit(1)
+
+        if type_name:
+            if type_name not in self.tracker_data.type_id.keys():
+                custom_console.bot_error_log(f"Type not available for '{type_name}' try:")
+                custom_console.bot_warning_log(";".join(list(self.tracker_data.type_id.keys())[:-1]))
+                exit()
+            filters['type_id'] = self.tracker_data.type_id.get(type_name)
+
+        if res_name:
+            if res_name not in self.tracker_data.resolution.keys():
+                custom_console.bot_error_log(f"Resolution not available for '{res_name}' try:")
+                custom_console.bot_warning_log(";".join(list(self.tracker_data.resolution.keys())[:-1]))
+                exit()
+            filters['resolution_id'] = self.tracker_data.resolution.get(res_name)
+
+        filters = {key: value for key, value in filters.items() if value}
+        custom_console.bot_log(f"Local search.. {' - '.join(f'{key}: {value}' for key, value in filters.items())}")
+        tracker_data = self.database.query(filters=filters, perPage=self.perPage)
+        self.page_view(tracker_data=tracker_data, tracker=self.database)
+
     # Filter 'Combo'
     def view_tmdb_res(self, tmdb_id: int, res_name: str) -> requests.Response | None:
 
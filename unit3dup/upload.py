@@ -6,7 +6,7 @@ import json
 from common.external_services.igdb.core.models.search import Game
 from common.trackers.trackers import TRACKData
 
-from unit3dup.pvtTracker import Unit3d
+from unit3dup.pvtTracker import Unit3d, Myhttp
 from unit3dup.pvtDocu import PdfImages
 from unit3dup import config_settings, Load
 from unit3dup.pvtVideo import Video
@@ -162,7 +162,7 @@ class UploadBot:
 
     @staticmethod
     def download_file(url: str, destination_path: str) -> bool:
-        download = requests.get(url)
+        download = Myhttp.pooled_session(url).get(url)
         if download.status_code == 200:
             # File archived
             with open(destination_path, "wb") as file:
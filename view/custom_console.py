@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import threading
+
 from rich.align import Align
 from rich.console import Console
 from rich.panel import Panel
@@ -10,6 +12,8 @@ from common import config_settings
 class CustomConsole(Console):
     def __init__(self):
         super().__init__(log_path=False)
+        # One question at a time when the upload pipeline runs more threads
+        self.input_lock = threading.RLock()
 
     def welcome_message(self):
         title_panel = Panel(
@@ -117,27 +121,29 @@ class CustomConsole(Console):
     def wait_for_user_confirmation(self, message: str):
         # Wait for user confirmation in case of validation failure
         try:
-            self.bot_error_log(message=message)
-            input("> ")
+            with self.input_lock:
+                self.bot_error_log(message=message)
+                input("> ")
         except KeyboardInterrupt:
             self.bot_error_log("\nOperation cancelled.Please update your config file")
             exit(0)
 
     def user_input(self,message: str)-> int:
         try:
-            while True:
-                self.bot_input_log(message=message)
-                user_tmdb_id = input()
-                if user_tmdb_id.isdigit():
-                    user_tmdb_id = int(user_tmdb_id)
-                    return user_tmdb_id if user_tmdb_id < 9999999 else 0
+            with self.input_lock:
+                while True:
+                    self.bot_input_log(message=message)
+                    user_tmdb_id = input()
+                    if user_tmdb_id.isdigit():
+                        user_tmdb_id = int(user_tmdb_id)
+                        return user_tmdb_id if user_tmdb_id < 9999999 else 0
         except KeyboardInterrupt:
             self.bot_error_log("\nOperation cancelled. Bye !")
             exit(0)
 
     def user_input_str(self,message: str)-> str:
         try:
-            while True:
+            with self.input_lock:
                 self.bot_input_log(message=message)
                 user_ = input()
                 return user_ if user_ else '0'